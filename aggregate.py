@@ -0,0 +1,131 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import tempfile
+
+import m3u
+import metrics
+import output
+import probecache
+
+# Builds one master playlist out of every published playlist.
+# Sources are streamed in priority order. An entry is dropped when a higher
+# priority entry already had the same normalized URL, or when a higher priority
+# source already listed its tvg-id (repeats inside one source are alternates and
+# stay). Survivors are sorted in bounded runs spilled to temp files and the runs
+# are k-way merged by (group, title, priority), so memory holds the seen keys
+# and one run, never the playlists themselves.
+
+MASTER_PATH = "master.m3u8"
+RUN_SIZE = 20000  # Entries sorted in memory before a run is spilled to disk
+
+# Highest priority first: live event sources, then the large static lists
+SOURCES = [
+    "justintv.m3u8", "tap.m3u8", "tap2.m3u8", "tap3.m3u8", "pronba.m3u8",
+    "pixelsports.m3u8", "rk.m3u8", "plutotv.m3u8", "supersonic.m3u8",
+    "testing.m3u8", "tfcmmk.m3u8", "tsn1.m3u8",
+]
+
+
+def _key(text):
+    # 8 bytes per seen key instead of the whole string
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def source_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def unique_entries(paths):
+    """Yields (rank, entry) for every entry that survives deduplication, in priority order."""
+    seen_urls = set()
+    seen_ids = set()
+    for rank, path in enumerate(paths):
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping missing {path}")
+            continue
+        source_ids = set()
+        kept = dropped = 0
+        for entry in m3u.parse(path):
+            url_key = _key(probecache.normalize_url(entry.url))
+            tvg_id = (entry.get("tvg-id") or "").strip().casefold()
+            id_key = _key(tvg_id) if tvg_id else None
+            if url_key in seen_urls or (id_key is not None and id_key in seen_ids):
+                dropped += 1
+                continue
+            seen_urls.add(url_key)
+            if id_key is not None:
+                source_ids.add(id_key)
+            if not entry.group:
+                entry.set_attr("group-title", source_name(path))
+            kept += 1
+            yield rank, entry
+        seen_ids |= source_ids
+        metrics.add("duplicates_dropped", dropped)
+        print(f"📥 {path}: {kept} kept, {dropped} duplicates")
+
+
+def _spill(records, folder, index):
+    records.sort()
+    path = os.path.join(folder, f"run-{index:04d}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+    return path
+
+
+def _read_run(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield tuple(json.loads(line))
+
+
+def _to_entry(text):
+    lines = text.rstrip("\n").split("\n")
+    entry = m3u.Entry.from_raw(lines[0].encode("utf-8"))
+    entry.options = lines[1:-1]
+    entry.url = lines[-1]
+    return entry
+
+
+def sorted_entries(ranked, folder, run_size=RUN_SIZE):
+    """Sorts (rank, entry) pairs by group, title and rank with an external merge sort."""
+    runs = []
+    records = []
+    for seq, (rank, entry) in enumerate(ranked):
+        records.append((entry.group.casefold(), entry.title.casefold(), rank, seq,
+                        entry.to_bytes().decode("utf-8", "replace")))
+        if len(records) >= run_size:
+            runs.append(_spill(records, folder, len(runs)))
+            records = []
+    if records:
+        runs.append(_spill(records, folder, len(runs)))
+    metrics.add("merge_runs", len(runs))
+    # seq is unique, so the merge never compares the entry text
+    for record in heapq.merge(*(_read_run(path) for path in runs)):
+        yield _to_entry(record[-1])
+
+
+@metrics.instrument("aggregate", MASTER_PATH)
+def build(paths=SOURCES, out=MASTER_PATH, run_size=RUN_SIZE):
+    with tempfile.TemporaryDirectory(prefix="aggregate-") as folder:
+        entries = sorted_entries(unique_entries(paths), folder, run_size)
+        count, changed = output.write_playlist(entries, out)
+    print(f"✅ {out}: {count} channels ({'updated' if changed else 'unchanged'})")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the published playlists into one master playlist.")
+    parser.add_argument("paths", nargs="*", help="playlists, highest priority first (default: SOURCES)")
+    parser.add_argument("-o", "--out", default=MASTER_PATH)
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE)
+    args = parser.parse_args()
+    build(args.paths or SOURCES, args.out, args.run_size)
+
+
+if __name__ == "__main__":
+    main()
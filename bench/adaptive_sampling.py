@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+import linkcheck
+from bench.origin import FakeOrigin
+
+# Fixed 500 KB sampling vs adaptive sampling against a local throttled origin.
+# Every stream is (rate in Mbps, TTFB in s); both modes should agree on pass/fail.
+#   python -m bench.adaptive_sampling
+
+MIN_MBPS = 0.8
+SAMPLE_SIZE = 500000
+STREAMS = [
+    (rate, ttfb)
+    for rate in (0.2, 0.5, 0.7, 1.0, 1.5, 3.0, 8.0, 20.0)
+    for ttfb in (0.0, 0.3, 1.0)
+]
+
+
+async def measure(base, strategy):
+    urls = [f"{base}/live/{i}.ts" for i in range(len(STREAMS))]
+    start = time.perf_counter()
+    async with linkcheck.Checker(strategy=strategy, timeout=15, sample_size=SAMPLE_SIZE,
+                                 min_mbps=MIN_MBPS, max_in_flight=len(urls), per_host=len(urls)) as checker:
+        results = await checker.check_many(urls)
+    return results, time.perf_counter() - start
+
+
+async def main():
+    profiles = {str(i): (200, ttfb, rate) for i, (rate, ttfb) in enumerate(STREAMS)}
+    origin = FakeOrigin(profiles=profiles, body_size=SAMPLE_SIZE * 4)
+    base = await origin.start()
+    fixed, fixed_time = await measure(base, linkcheck.SAMPLE)
+    adaptive, adaptive_time = await measure(base, linkcheck.ADAPTIVE)
+    await origin.stop()
+
+    agree = 0
+    print(f"{'Mbps':>5} {'TTFB':>5} | {'fixed':>14} | {'adaptive':>14} {'ttfb':>6} {'sustained':>9}")
+    for (rate, ttfb), f, a in zip(STREAMS, fixed, adaptive):
+        agree += f.ok == a.ok
+        print(f"{rate:>5} {ttfb:>5} | {'PASS' if f.ok else 'fail':>4} {f.nbytes:>9} B | "
+              f"{'PASS' if a.ok else 'fail':>4} {a.nbytes:>9} B {a.ttfb or 0:>6.2f} {a.throughput or 0:>9.2f}")
+    fixed_bytes = sum(r.nbytes for r in fixed)
+    adaptive_bytes = sum(r.nbytes for r in adaptive)
+    print(f"\nverdicts agree: {agree}/{len(STREAMS)}")
+    print(f"bytes read: fixed {fixed_bytes}, adaptive {adaptive_bytes} "
+          f"({adaptive_bytes / fixed_bytes:.0%}); wall time {fixed_time:.1f}s vs {adaptive_time:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+import sys
+import tempfile
+import time
+
+import requests
+
+import fetch
+from bench.origin import FakeOrigin
+
+# fetch.fetch against a local origin that honours If-None-Match / If-Modified-Since
+# and gzip: a cold download, a 304, a 200 with an identical body when the origin
+# sends no validators, and a real change. Prints what each step cost.
+#   python -m bench.conditional_fetch [playlist]
+
+DEFAULT_FILE = "tsn1.m3u8"
+
+
+def main(path):
+    with open(path, "rb") as f:
+        body = f.read()
+    origin = FakeOrigin()
+    origin.set_playlist(body)
+    url = f"{origin.start_in_thread()}/playlist.m3u"
+
+    with tempfile.TemporaryDirectory() as folder, requests.Session() as session:
+        def step(label, expect_changed):
+            sent = origin.bytes_sent
+            start = time.perf_counter()
+            fetched = fetch.fetch(url, "bench", session, folder=folder)
+            seconds = time.perf_counter() - start
+            with open(fetched.path, "rb") as f:
+                intact = f.read() == origin.playlist_body
+            ok = fetched.changed == expect_changed and intact
+            print(f"{label:<22} status={fetched.status} changed={fetched.changed!s:<5} "
+                  f"{(origin.bytes_sent - sent) / 1000:8.1f} kB on the wire  "
+                  f"{seconds * 1000:6.1f} ms  {'ok' if ok else 'WRONG'}")
+            fetched.commit()
+            return ok
+
+        print(f"{path}: {len(body) / 1000:.1f} kB")
+        results = [step("cold", True), step("conditional (304)", False)]
+        origin.validators = False
+        results.append(step("no validators, same", False))
+        origin.validators = True
+        origin.set_playlist(body + b'#EXTINF:-1 group-title="New",New channel\nhttp://example.com/new.m3u8\n')
+        results.append(step("changed upstream", True))
+        results.append(step("conditional again", False))
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FILE) else 1)
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import delta
+import linkcheck
+import m3u
+import output
+import probecache
+from bench import playlists
+from bench.origin import FakeOrigin
+
+# Probes per run with delta re-validation against a local origin: a cold run,
+# then runs where a small share of the URLs change. Each run's playlist is
+# published like the scripts do, and the bench checks that every unchanged URL
+# was re-probed within SLICES runs.
+#   python -m bench.delta_probe [--entries N] [--slices N] [--churn 0.02]
+
+
+def playlist(count, base, generation, churn):
+    """Entries of the synthetic playlist; a different `churn` share gets a new URL each generation."""
+    period = round(1 / churn)
+    entries = []
+    for entry in m3u.parse(playlists.synthetic(count)):
+        i = int(entry.url.rsplit("/", 1)[1].split(".")[0])
+        entry.url = entry.url.replace(playlists.PLACEHOLDER, base)
+        # Entry i gets a new URL in generations r + 1, r + 1 + period, ... with r = i % period
+        version = max(0, (generation - 1 - i % period) // period + 1)
+        if version:
+            entry.url += f"?v={version}"
+        entries.append(entry)
+    return entries
+
+
+async def check_all(entries, cache, plan):
+    async with linkcheck.Checker(strategy=linkcheck.HEAD, timeout=5, cache=cache, delta=plan) as checker:
+        return await checker.check_many([entry.url for entry in entries])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--slices", type=int, default=delta.SLICES)
+    parser.add_argument("--churn", type=float, default=0.02, help="share of URLs changed per run")
+    args = parser.parse_args()
+
+    origin = FakeOrigin(latency=0.002, failure_rate=0.1)
+    base = origin.start_in_thread()
+    with tempfile.TemporaryDirectory() as folder:
+        published = os.path.join(folder, "out.m3u8")
+        state = os.path.join(folder, "delta.json")
+        reprobed = {}
+        with probecache.ProbeCache(os.path.join(folder, "probes.sqlite")) as cache:
+            for run in range(args.slices + 1):
+                entries = playlist(args.entries, base, run, args.churn)
+                plan = delta.Delta("bench", cache, slices=args.slices, state_path=state)
+                sent = origin.requests
+                start = time.perf_counter()
+                results = asyncio.run(check_all(entries, cache, plan))
+                seconds = time.perf_counter() - start
+                if run:
+                    for result in results:
+                        if not result.cached:
+                            reprobed[result.url] = run
+                output.write_playlist((e for e, r in zip(entries, results) if r.ok), published)
+                plan.finish()
+                print(f"run {run:2d}  probes={origin.requests - sent:5d}  {seconds * 1000:7.1f} ms  {plan.report()}")
+        # URLs present since the cold run and never changed must all have been re-probed
+        stable = [e.url for e in playlist(args.entries, base, args.slices, args.churn) if "?v=" not in e.url]
+        missed = sum(1 for url in stable if url not in reprobed)
+        print(f"{len(stable)} unchanged URLs, {missed} not re-probed within {args.slices} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import sys
+import time
+
+import m3u
+import m3ufilter
+
+# Selecting a handful of channels out of a large playlist: the old rk.py loop
+# (parse everything, upper() the title once per target) against a compiled
+# m3ufilter.Filter whose prefilter rejects lines before they are decoded.
+# The bare parse rate is the reference the filter should keep up with.
+#   python -m bench.filter_select [playlist] [target ...]
+
+DEFAULT_FILE = "tsn1.m3u8"
+DEFAULT_TARGETS = ["STAR MOVIES", "STAR MOVIES SELECT"]
+ROUNDS = 5
+
+
+def old_select(path, targets):
+    return [entry for entry in m3u.parse(path)
+            if entry.url.startswith("http") and any(t.upper() in entry.title.upper() for t in targets)]
+
+
+def best(func):
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main(path, targets):
+    size_mb = m3u.os.path.getsize(path) / 1e6
+    compiled = m3ufilter.Filter(include=targets)
+    parse_time, total = best(lambda: sum(1 for _ in m3u.parse(path)))
+    old_time, old = best(lambda: old_select(path, targets))
+    new_time, new = best(lambda: list(compiled.parse(path)))
+    same = [e.to_bytes() for e in old] == [e.to_bytes() for e in new]
+    print(f"{path}: {total} entries, {len(new)} selected, same={same}")
+    for label, seconds in (("parse only", parse_time), ("old filter", old_time), ("m3ufilter", new_time)):
+        print(f"{label:<11} {seconds * 1000:7.1f} ms  {size_mb / seconds:7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(args[0] if args else DEFAULT_FILE, args[1:] or DEFAULT_TARGETS)
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+
+from aiohttp import web
+from playwright.async_api import async_playwright
+
+import justintv
+
+# Old justintv.py page flow vs the current one against a saved local fixture
+# (bench/fixtures/justintv) plus heavy images, fonts, media and analytics.
+# Bytes are counted on the server side so both flows are measured the same way.
+#   python -m bench.justintv_scrape
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "justintv")
+ASSETS = {
+    "/css/site.css": (b"body{margin:0}\n" * 700, "text/css"),
+    "/js/app.js": (b"window.app = {};\n" * 1200, "application/javascript"),
+    "/js/analytics.js": (b"/* tracking */\n" * 2000, "application/javascript"),
+    "/fonts/site.woff2": (b"\0" * 80000, "font/woff2"),
+    "/media/promo.mp4": (b"\0" * 2000000, "video/mp4"),
+}
+IMAGE = (b"\x89PNG" + b"\0" * 150000, "image/png")
+
+
+class Origin:
+    def __init__(self):
+        self.bytes = 0
+        self.requests = 0
+
+    @web.middleware
+    async def count(self, request, handler):
+        response = await handler(request)
+        self.requests += 1
+        self.bytes += len(response.body or b"")
+        return response
+
+    async def page(self, request):
+        name = "event.html" if request.path.startswith("/event") else "index.html"
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            return web.Response(body=f.read(), content_type="text/html")
+
+    async def asset(self, request):
+        body, content_type = ASSETS.get(request.path, IMAGE)
+        return web.Response(body=body, content_type=content_type)
+
+    def start(self):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        loop = asyncio.new_event_loop()
+
+        async def serve():
+            app = web.Application(middlewares=[self.count])
+            app.router.add_get("/", self.page)
+            app.router.add_get("/event.html", self.page)
+            app.router.add_get("/{tail:.+}", self.asset)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.SockSite(runner, sock).start()
+
+        loop.run_until_complete(serve())
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/"
+
+
+async def old_flow(page):
+    """The page calls justintv.py made before interception and the shared page."""
+    domain = justintv.JUSTINTV_DOMAIN
+    await page.goto(domain, timeout=25000, wait_until='domcontentloaded')
+    await page.wait_for_selector("iframe#customIframe", timeout=15000)
+    iframe = await page.query_selector("iframe#customIframe")
+    event_url = justintv.urljoin(domain, await iframe.get_attribute('src'))
+    await page.goto(event_url, timeout=20000, wait_until="domcontentloaded")
+    await page.content()
+    await page.goto(domain, timeout=45000, wait_until='networkidle')
+    await page.wait_for_timeout(3000)
+    for element in await page.query_selector_all(".mac[data-url]"):
+        await element.get_attribute('data-url')
+        await (await element.query_selector(".takimlar")).inner_text()
+        await (await element.query_selector(".saat")).inner_text()
+
+
+async def compare(origin):
+    async with async_playwright() as p:
+        chromium = await p.chromium.launch(headless=True)
+        for name, flow in (("old", old_flow), ("current", justintv.scrape)):
+            context = await chromium.new_context(user_agent=justintv.USER_AGENT)
+            page = await context.new_page()
+            origin.bytes = origin.requests = 0
+            start = time.perf_counter()
+            await flow(page)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<8} {elapsed:6.2f}s  {origin.bytes / 1024:8.0f} KB served  {origin.requests} requests")
+            await context.close()
+        await chromium.close()
+
+
+def main():
+    origin = Origin()
+    # The origin gets its own loop in a thread, so it starts before asyncio.run
+    justintv.JUSTINTV_DOMAIN = origin.start()
+    asyncio.run(compare(origin))
+
+
+if __name__ == "__main__":
+    main()
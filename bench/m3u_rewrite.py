@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+import m3u
+
+# Compares the old splitlines() + re.sub rewrite with the streaming m3u parser.
+# Each mode runs in its own interpreter so peak RSS is measured in isolation.
+#   python -m bench.m3u_rewrite [playlist ...]
+
+DEFAULT_FILES = ["plutotv.m3u8", "tsn1.m3u8"]
+ROUNDS = 5
+MIN_SECONDS = 0.5  # Small files get more rounds, so one slow round cannot skew the best time
+GROUP = "Pluto TV"
+
+
+def rewrite_regex(path, out):
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    new_m3u = ["#EXTM3U"]
+    current_info = None
+    for line in lines:
+        line = line.strip()
+        if not line: continue
+        if line.startswith("#EXTINF"):
+            if 'group-title="' in line:
+                current_info = re.sub(r'group-title="[^"]*"', f'group-title="{GROUP}"', line)
+            else:
+                current_info = line.replace('#EXTINF:-1', f'#EXTINF:-1 group-title="{GROUP}"')
+        elif line.startswith("http") and current_info:
+            new_m3u.append(current_info)
+            new_m3u.append(line)
+            current_info = None
+    out.write("\n".join(new_m3u).encode("utf-8"))
+    return (len(new_m3u) - 1) // 2
+
+
+def rewrite_m3u(path, out):
+    def rewritten():
+        for entry in m3u.parse(path):
+            entry.set_attr("group-title", GROUP)
+            yield entry
+    return m3u.write(rewritten(), out)
+
+
+MODES = {"regex": rewrite_regex, "m3u": rewrite_m3u}
+
+
+def run_mode(mode, path):
+    func = MODES[mode]
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best = None
+    with open(os.devnull, "wb") as out:
+        rounds = total = 0
+        while rounds < ROUNDS or total < MIN_SECONDS:
+            start = time.perf_counter()
+            count = func(path, out)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            rounds += 1
+            total += elapsed
+    size_mb = os.path.getsize(path) / 1e6
+    return {
+        "mode": mode,
+        "file": path,
+        "entries": count,
+        "seconds": round(best, 5),
+        "mb_per_s": round(size_mb / best, 1),
+        "entries_per_s": int(count / best),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb,
+    }
+
+
+def main(paths):
+    results = []
+    for path in paths:
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "bench.m3u_rewrite", "--mode", mode, path],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            r = json.loads(out)
+            results.append(r)
+            print(f"{path:<16} {mode:<6} {r['entries']:>7} entries  {r['mb_per_s']:>7} MB/s  "
+                  f"{r['entries_per_s']:>9} entries/s  peak RSS {r['peak_rss_kb']} KB (+{r['rss_growth_kb']} KB)")
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--mode"]:
+        print(json.dumps(run_mode(args[1], args[2])))
+    else:
+        main(args or DEFAULT_FILES)
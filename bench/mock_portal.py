@@ -0,0 +1,86 @@
+import asyncio
+import json
+import socket
+import threading
+
+from aiohttp import web
+
+# Local Stalker (portal.php) and Xtream (player_api.php) mock.
+# Stalker pages are MAX_PAGE_ITEMS long and every response is delayed by
+# `latency`, so paging and caching behaviour can be measured offline.
+
+MAX_PAGE_ITEMS = 14
+TOKEN = "MOCKTOKEN"
+
+
+class MockPortal:
+    def __init__(self, genres=None, channels_per_genre=60, live_streams=5000, latency=0.02):
+        self.genres = genres or ["US| NEWS", "US| NBA PASS PPV ⁸ᴷ", "UK| SPORTS", "CA| GENERAL"]
+        self.channels_per_genre = channels_per_genre
+        self.live_streams = live_streams
+        self.latency = latency
+        self.calls = {}
+
+    def _count(self, action):
+        self.calls[action] = self.calls.get(action, 0) + 1
+
+    async def stalker(self, request):
+        await asyncio.sleep(self.latency)
+        action = request.query.get("action")
+        self._count(action)
+        if action == "handshake":
+            return web.json_response({"js": {"token": TOKEN}})
+        if request.headers.get("Authorization") != f"Bearer {TOKEN}":
+            return web.json_response({"js": None}, status=401)
+        if action == "get_profile":
+            return web.json_response({"js": {"id": 1, "status": 1}})
+        if action == "get_genres":
+            return web.json_response({"js": [{"id": str(i + 1), "title": t} for i, t in enumerate(self.genres)]})
+        if action == "get_ordered_list":
+            genre = int(request.query.get("genre", 1))
+            page = int(request.query.get("p", 1))
+            start = (page - 1) * MAX_PAGE_ITEMS
+            ids = range(start, min(start + MAX_PAGE_ITEMS, self.channels_per_genre))
+            data = [{"id": str(genre * 100000 + i), "name": f"Team {i} - Team {i + 1} | Sat 01 Mar 19:{i % 60:02d}"}
+                    for i in ids]
+            return web.json_response({"js": {"total_items": self.channels_per_genre,
+                                             "max_page_items": MAX_PAGE_ITEMS,
+                                             "cur_page": page, "data": data}})
+        return web.json_response({"js": None})
+
+    async def xtream(self, request):
+        await asyncio.sleep(self.latency)
+        self._count(request.query.get("action"))
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        await response.write(b"[")
+        for i in range(self.live_streams):
+            item = {"num": i + 1, "name": f"Channel {i}", "stream_type": "live", "stream_id": i,
+                    "stream_icon": "", "epg_channel_id": None, "category_id": str(i % 40)}
+            await response.write((b"," if i else b"") + json.dumps(item).encode())
+        await response.write(b"]")
+        return response
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/portal.php", self.stalker)
+        app.router.add_get("/player_api.php", self.xtream)
+        return app
+
+    async def start(self):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        await web.SockSite(self.runner, sock).start()
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def start_in_thread(self):
+        """Serves from a daemon thread, for clients that block (the Stalker client)."""
+        loop = asyncio.new_event_loop()
+        base = loop.run_until_complete(self.start())
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        return base
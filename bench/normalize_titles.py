@@ -0,0 +1,65 @@
+import random
+import re
+import sys
+import time
+
+import normalize
+import pxl
+
+# Old pxl.clean_title (two re.sub calls plus a replace per TEAM_MAP entry) vs the
+# compiled normalize rules, with the real 30-team map and with a map grown to
+# cover more leagues. "cold" titles are all distinct, "repeat" titles recur as
+# they do across sources, which is where the memo helps.
+#   python -m bench.normalize_titles [titles]
+
+TITLES = 20000
+GROWN_TEAMS = 1000
+
+
+def old_clean_title(title, team_map):
+    title = re.sub(r'\[NBA\]', '', title, flags=re.IGNORECASE)
+    title = re.sub(r'\(PIXEL\)', '', title, flags=re.IGNORECASE)
+    for full_name, short_name in team_map.items():
+        if full_name in title:
+            title = title.replace(full_name, short_name)
+    return ' '.join(title.split())
+
+
+def grown_map(size, seed=0):
+    rng = random.Random(seed)
+    teams = dict(pxl.TEAM_MAP)
+    while len(teams) < size:
+        name = f"{rng.choice(['North', 'South', 'Real', 'FC', 'United', 'City'])} " \
+               f"{''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(7)).title()}"
+        teams[name] = name[:3].upper()
+    return teams
+
+
+def titles(team_map, count, distinct, seed=1):
+    rng = random.Random(seed)
+    names = list(team_map)
+    pool = [f"[NBA] {rng.choice(names)} vs {rng.choice(names)} (PIXEL) #{i}" for i in range(distinct)]
+    return [pool[i % distinct] for i in range(count)]
+
+
+def rate(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main(count):
+    for label, team_map in (("30 teams", pxl.TEAM_MAP), (f"{GROWN_TEAMS} teams", grown_map(GROWN_TEAMS))):
+        for mode, distinct in (("cold", count), ("repeat", max(1, count // 50))):
+            items = titles(team_map, count, distinct)
+            rules = normalize.Normalizer(remove=["[NBA]", "(PIXEL)"], abbreviations=team_map)
+            old = rate(lambda t: old_clean_title(t, team_map), items)
+            new = rate(rules, items)
+            same = all(old_clean_title(t, team_map) == rules(t) for t in items[:2000])
+            print(f"{label:<11} {mode:<6} old {old:>10.0f}/s  compiled {new:>10.0f}/s  "
+                  f"x{new / old:5.1f}  same={same}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else TITLES)
@@ -0,0 +1,149 @@
+import asyncio
+import gzip
+import hashlib
+import random
+import socket
+import threading
+import time
+import zlib
+from email.utils import formatdate
+
+from aiohttp import web
+
+# Local fake IPTV origin serving /live/{id}.ts.
+# Every stream id gets a deterministic profile from `seed`: whether it fails
+# (failure_rate), which status it fails with (fail_statuses), its latency
+# (latency +- jitter) and its throughput in Mbps, unless `profiles` fixes them
+# for some ids. HEAD and Range are honoured.
+# bytes_sent counts what was handed to the transport. A client that hangs up
+# early (a SAMPLE probe) has read far less than that, since the kernel buffers
+# absorb the rest; compare probe strategies on the client's Result.nbytes.
+# /playlist.m3u serves set_playlist()'s body like an upstream source would:
+# ETag, Last-Modified, conditional requests and gzip.
+#   origin = FakeOrigin(latency=0.02, failure_rate=0.1); base = await origin.start()
+
+CHUNK = 16 * 1024
+
+
+class FakeOrigin:
+    def __init__(self, latency=0.01, jitter=0.0, mbps=None, failure_rate=0.1,
+                 fail_statuses=(404,), body_size=1024 * 1024, seed=0, profiles=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.mbps = mbps  # None = as fast as the loopback allows; or (low, high) per stream
+        self.failure_rate = failure_rate
+        self.fail_statuses = tuple(fail_statuses)
+        self.body_size = body_size
+        self.seed = seed
+        self.profiles = profiles or {}  # {stream id: (status, latency, mbps)}
+        self.requests = 0
+        self.bytes_sent = 0
+        self.runner = None
+        self.playlist_body = None
+        self.playlist_modified = None
+        self.validators = True  # False: no ETag/Last-Modified, every request gets a 200
+
+    def profile(self, stream_id):
+        """Returns (status, latency, mbps) for a stream id; the same on every call."""
+        if str(stream_id) in self.profiles:
+            return self.profiles[str(stream_id)]
+        rng = random.Random(zlib.crc32(f"{self.seed}:{stream_id}".encode()))
+        status = 200
+        if rng.random() < self.failure_rate:
+            status = rng.choice(self.fail_statuses)
+        latency = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        mbps = self.mbps
+        if isinstance(mbps, tuple):
+            mbps = rng.uniform(*mbps)
+        return status, latency, mbps
+
+    def is_live(self, stream_id):
+        return self.profile(stream_id)[0] == 200
+
+    async def stream(self, request):
+        self.requests += 1
+        status, latency, mbps = self.profile(request.match_info["id"])
+        if latency:
+            await asyncio.sleep(latency)
+        if status != 200:
+            return web.Response(status=status)
+        size = self.body_size
+        status = 200
+        range_header = request.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            first, _, last = range_header[6:].partition("-")
+            size = min(size, int(last or size - 1) - int(first or 0) + 1)
+            status = 206
+        headers = {"Content-Type": "video/mp2t", "Content-Length": str(size)}
+        if request.method == "HEAD":
+            return web.Response(status=status, headers=headers)
+
+        response = web.StreamResponse(status=status, headers=headers)
+        await response.prepare(request)
+        rate = mbps * 1000000 / 8 if mbps else None
+        payload = b"\x47" * CHUNK
+        start = time.perf_counter()
+        sent = 0
+        try:
+            while sent < size:
+                piece = payload[:min(CHUNK, size - sent)]
+                await response.write(piece)
+                sent += len(piece)
+                self.bytes_sent += len(piece)
+                if rate:
+                    delay = start + sent / rate - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        return response
+
+    def set_playlist(self, body):
+        """Replaces the body of /playlist.m3u; its ETag and Last-Modified move with it."""
+        self.playlist_body = body
+        self.playlist_modified = formatdate(time.time(), usegmt=True)
+
+    async def playlist(self, request):
+        self.requests += 1
+        body = self.playlist_body
+        if body is None:
+            return web.Response(status=404)
+        headers = {"Content-Type": "audio/x-mpegurl"}
+        if self.validators:
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            headers["ETag"] = etag
+            headers["Last-Modified"] = self.playlist_modified
+            if_none_match = request.headers.get("If-None-Match")
+            if (if_none_match == etag if if_none_match is not None
+                    else request.headers.get("If-Modified-Since") == self.playlist_modified):
+                return web.Response(status=304, headers=headers)
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self.bytes_sent += len(body)
+        return web.Response(body=body, headers=headers)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_route("*", "/live/{id}.ts", self.stream)
+        app.router.add_route("*", "/live/{user}/{password}/{id}.ts", self.stream)
+        app.router.add_get("/playlist.m3u", self.playlist)
+        return app
+
+    async def start(self):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        await web.SockSite(self.runner, sock).start()
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def start_in_thread(self):
+        """Serves from a daemon thread, for benchmarks whose client blocks or owns the loop."""
+        loop = asyncio.new_event_loop()
+        base = loop.run_until_complete(self.start())
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        return base
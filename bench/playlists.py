@@ -0,0 +1,48 @@
+import os
+import random
+
+# Playlists for the benchmarks: synthetic ones of a given size, generated once
+# into DATA_DIR, and the real checked-in playlists as fixtures.
+
+DATA_DIR = os.path.join(".cache", "bench")
+SIZES = (1000, 10000, 100000)
+FIXTURES = ("tsn1.m3u8", "haha.m3u8")
+PLACEHOLDER = "http://origin.invalid"  # swapped for a live FakeOrigin base by the probe pipelines
+GROUPS = ["News", "Sports", "Movies", "Kids", "Music", "Documentary", "UHD 4K", "Local"]
+
+
+def synthetic_lines(count, base=PLACEHOLDER, seed=0):
+    """Yields the lines of a playlist with `count` entries whose URLs are base/live/{i}.ts.
+
+    About one title in five repeats an earlier one, like mirrors in real lists,
+    and one entry in ten carries #EXTVLCOPT options.
+    """
+    rng = random.Random(seed)
+    yield "#EXTM3U"
+    for i in range(count):
+        title = f"Channel {rng.randrange(i)}" if i and rng.random() < 0.2 else f"Channel {i}"
+        group = rng.choice(GROUPS)
+        yield (f'#EXTINF:-1 tvg-id="ch{i}.bench" tvg-name="{title}" '
+               f'tvg-logo="https://img.example/{i}.png" group-title="{group}",{title}')
+        if i % 10 == 0:
+            yield "#EXTVLCOPT:http-user-agent=Mozilla/5.0"
+            yield "#EXTVLCOPT:http-referrer=https://example.com/"
+        yield f"{base}/live/{i}.ts"
+
+
+def synthetic(count, folder=DATA_DIR):
+    """Returns the path of a synthetic playlist, writing it on first use."""
+    path = os.path.join(folder, f"synthetic_{count}.m3u8")
+    if not os.path.exists(path):
+        os.makedirs(folder, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for line in synthetic_lines(count):
+                f.write(line)
+                f.write("\n")
+        os.replace(tmp, path)
+    return path
+
+
+def all_playlists(sizes=SIZES):
+    return [synthetic(n) for n in sizes] + [path for path in FIXTURES if os.path.exists(path)]
@@ -0,0 +1,49 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import linkcheck
+from bench.origin import FakeOrigin
+
+# Checks/s of the shared linkcheck engine against the old plutotv.py pattern
+# (25 threads, one requests.get per URL, no shared Session) on a local origin.
+#   python -m bench.probe_rate [streams]
+
+STREAMS = 2000
+LATENCY = 0.005
+
+
+def old_check(url):
+    try:
+        response = requests.get(url, timeout=5, stream=True)
+        ok = response.status_code == 200
+        response.close()
+        return ok
+    except Exception:
+        return False
+
+
+def main(streams):
+    origin = FakeOrigin(latency=LATENCY, failure_rate=0.1, body_size=1024)
+    base = origin.start_in_thread()
+    urls = [f"{base}/live/{i}.ts" for i in range(streams)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=25) as executor:
+        old_live = sum(executor.map(old_check, urls))
+    old_rate = streams / (time.perf_counter() - start)
+    print(f"threads+requests   {old_rate:8.0f} checks/s  live={old_live}")
+
+    for strategy in (linkcheck.HEAD, linkcheck.RANGE, linkcheck.SAMPLE):
+        start = time.perf_counter()
+        results = linkcheck.check_urls(urls, strategy=strategy, per_host=100, max_in_flight=100,
+                                       sample_size=1024, min_bytes=0)
+        rate = streams / (time.perf_counter() - start)
+        live = sum(r.ok for r in results)
+        print(f"linkcheck {strategy:<8} {rate:8.0f} checks/s  live={live}  x{rate / old_rate:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else STREAMS)
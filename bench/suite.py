@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import linkcheck
+import m3u
+import plutotv
+import portal
+import probecache
+from bench import playlists
+from bench.mock_portal import MockPortal
+from bench.origin import FakeOrigin
+
+# Offline benchmark suite. Every pipeline runs in its own interpreter so its peak
+# RSS is its own; the results of one run go to a single JSON file.
+#   python -m bench.suite [--quick] [--only parse probe ...] [--out results.json] [--compare old.json]
+
+RESULTS_DIR = os.path.join(playlists.DATA_DIR, "results")
+ROUNDS = 3
+PROBES = 5000
+QUICK_SIZES = (1000, 10000)
+QUICK_PROBES = 1000
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def latency_stats(results):
+    latencies = [r.latency for r in results if r.latency is not None]
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+def best_of(func, rounds=ROUNDS):
+    best = value = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        value = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+# --- pipelines: each returns a dict of measurements ---
+
+def bench_parse(path):
+    size_mb = os.path.getsize(path) / 1e6
+    seconds, count = best_of(lambda: sum(1 for _ in m3u.parse(path)))
+    return {"file": path, "entries": count, "seconds": round(seconds, 4),
+            "mb_per_s": round(size_mb / seconds, 1), "entries_per_s": int(count / seconds)}
+
+
+def bench_rewrite(path):
+    def rewrite():
+        with open(os.devnull, "wb") as out:
+            def entries():
+                for entry in m3u.parse(path):
+                    entry.set_attr("group-title", "Bench")
+                    yield entry
+            return m3u.write(entries(), out)
+    size_mb = os.path.getsize(path) / 1e6
+    seconds, count = best_of(rewrite)
+    return {"file": path, "entries": count, "seconds": round(seconds, 4),
+            "mb_per_s": round(size_mb / seconds, 1)}
+
+
+def bench_probe(strategy, count, latency="0.01", failure_rate="0.1"):
+    count = int(count)
+    origin = FakeOrigin(latency=float(latency), jitter=float(latency) / 2,
+                        failure_rate=float(failure_rate), fail_statuses=(404, 403, 500, 503))
+    base = origin.start_in_thread()
+    urls = [f"{base}/live/{i}.ts" for i in range(count)]
+    start = time.perf_counter()
+    results = linkcheck.check_urls(urls, strategy=strategy, per_host=100, max_in_flight=100,
+                                   range_bytes=1024, sample_size=64 * 1024, min_bytes=0)
+    seconds = time.perf_counter() - start
+    correct = sum(r.ok == origin.is_live(i) for i, r in enumerate(results))
+    return {"strategy": strategy, "checks": count, "seconds": round(seconds, 3),
+            "checks_per_s": round(count / seconds, 1), "live": sum(r.ok for r in results),
+            "correct": correct, "bytes_read": sum(r.nbytes for r in results), **latency_stats(results)}
+
+
+def bench_plutotv(count):
+    """plutotv.py's pipeline minus the download: parse, dedup, probe each title until one is live."""
+    origin = FakeOrigin(latency=0.005, failure_rate=0.2)
+    base = origin.start_in_thread()
+    path = playlists.synthetic(int(count))
+    start = time.perf_counter()
+    entries = []
+    for entry in m3u.parse(path):
+        entry.url = entry.url.replace(playlists.PLACEHOLDER, base)
+        entry.set_attr("group-title", "Pluto TV")
+        entries.append(entry)
+    parsed = time.perf_counter()
+    groups = plutotv.group_candidates(entries)
+    with tempfile.TemporaryDirectory() as folder:
+        with probecache.ProbeCache(os.path.join(folder, "probes.sqlite")) as cache:
+            winners, probed = asyncio.run(plutotv.pick_live(groups, cache))
+    seconds = time.perf_counter() - start
+    return {"entries": len(entries), "titles": len(groups), "probed": probed,
+            "live": sum(1 for w in winners if w), "parse_seconds": round(parsed - start, 3),
+            "seconds": round(seconds, 3), "checks_per_s": round(probed / (seconds - (parsed - start)), 1)}
+
+
+def bench_stalker(channels):
+    mock = MockPortal(channels_per_genre=int(channels), latency=0.02)
+    base = mock.start_in_thread()
+    start = time.perf_counter()
+    with portal.StalkerClient(base, "00:1A:79:00:00:00") as client:
+        client.connect()
+        listing = client.channels_for(["US| NBA PASS PPV ⁸ᴷ"])
+    seconds = time.perf_counter() - start
+    items = sum(len(v) for v in listing.values())
+    return {"channels": items, "pages": mock.calls.get("get_ordered_list", 0),
+            "seconds": round(seconds, 3), "items_per_s": round(items / seconds, 1)}
+
+
+def bench_xtream(streams):
+    import aiohttp
+
+    async def consume(base):
+        async with aiohttp.ClientSession() as session:
+            client = portal.XtreamClient(base, "bench", "bench", session)
+            return sum([1 async for _ in client.live_streams()])
+
+    mock = MockPortal(live_streams=int(streams), latency=0.0)
+    base = mock.start_in_thread()
+    start = time.perf_counter()
+    items = asyncio.run(consume(base))
+    seconds = time.perf_counter() - start
+    return {"streams": items, "seconds": round(seconds, 3), "items_per_s": round(items / seconds, 1)}
+
+
+PIPELINES = {
+    "parse": bench_parse,
+    "rewrite": bench_rewrite,
+    "probe": bench_probe,
+    "plutotv": bench_plutotv,
+    "stalker": bench_stalker,
+    "xtream": bench_xtream,
+}
+
+
+def plan(quick=False):
+    """Returns every (pipeline, args) pair of one suite run."""
+    files = playlists.all_playlists(QUICK_SIZES if quick else playlists.SIZES)
+    probes = QUICK_PROBES if quick else PROBES
+    jobs = [("parse", [path]) for path in files]
+    jobs += [("rewrite", [path]) for path in files]
+    jobs += [("probe", [strategy, str(probes)])
+             for strategy in (linkcheck.HEAD, linkcheck.RANGE, linkcheck.SAMPLE)]
+    jobs += [("plutotv", [str(probes)]), ("stalker", ["2000"]), ("xtream", [str(probes * 20)])]
+    return jobs
+
+
+def run_one(name, args):
+    """Runs one pipeline in this interpreter and adds its peak RSS."""
+    result = PIPELINES[name](*args)
+    return {"pipeline": name, "args": args, **result,
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def summary(result):
+    skip = {"pipeline", "args", "file", "strategy"}
+    fields = "  ".join(f"{k}={v}" for k, v in result.items() if k not in skip)
+    label = result.get("file") or result.get("strategy") or " ".join(result["args"])
+    return f"{result['pipeline']:<8} {label:<32} {fields}"
+
+
+def compare(results, old_path):
+    """Prints the change of every rate and RSS figure against an older results file."""
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["pipeline"], tuple(r["args"])): r for r in json.load(f)["results"]}
+    print(f"\nvs {old_path}:")
+    for result in results:
+        before = old.get((result["pipeline"], tuple(result["args"])))
+        if before is None:
+            continue
+        changes = []
+        for key in ("mb_per_s", "checks_per_s", "items_per_s", "p99_ms", "peak_rss_kb"):
+            if result.get(key) and before.get(key):
+                changes.append(f"{key} {result[key] / before[key] - 1:+.0%}")
+        print(f"{result['pipeline']:<8} {' '.join(result['args']):<32} {'  '.join(changes)}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite.")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k playlist, fewer probes")
+    parser.add_argument("--only", nargs="+", choices=sorted(PIPELINES), help="pipelines to run")
+    parser.add_argument("--out", help="results file (default: a timestamped file in .cache/bench/results)")
+    parser.add_argument("--compare", help="older results file to compare against")
+    parser.add_argument("--run", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_one(args.run[0], args.run[1:])))
+        return
+
+    results = []
+    for name, job_args in plan(args.quick):
+        if args.only and name not in args.only:
+            continue
+        out = subprocess.run([sys.executable, "-m", "bench.suite", "--run", name, *job_args],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{name} {' '.join(job_args)} failed:\n{out.stderr.strip()}")
+            continue
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(summary(result))
+
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    path = args.out or os.path.join(RESULTS_DIR, f"{stamp}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": stamp, "commit": git_commit(), "python": platform.python_version(),
+                   "platform": platform.platform(), "quick": args.quick, "results": results}, f, indent=1)
+    print(f"\nResults saved to {path}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from urllib.parse import urlsplit
+
+# Request filtering shared by the Playwright scrapers.
+# Pages only need their HTML and first-party scripts to set cookies and expose
+# data; images, media, fonts, ad/analytics URLs and (optionally) third-party
+# scripts are aborted.
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_URL_WORDS = (
+    "doubleclick", "googlesyndication", "googleadservices", "adservice", "adsystem",
+    "google-analytics", "googletagmanager", "analytics", "histats", "hotjar",
+    "yandex", "facebook.net", "popads", "propeller", "onclick", "adsterra",
+)
+# Resource types whose repeat GETs are served from memory by Interceptor
+CACHEABLE_TYPES = {"document", "script", "stylesheet"}
+
+
+def _host(url):
+    return (urlsplit(url).hostname or "").lower()
+
+
+def is_first_party(url, first_party_host):
+    host = _host(url)
+    return host == first_party_host or host.endswith("." + first_party_host)
+
+
+def should_block(request, first_party_host, third_party_scripts=True):
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    parts = urlsplit(request.url)
+    location = (parts.hostname or "").lower() + parts.path.lower()
+    if any(word in location for word in BLOCKED_URL_WORDS):
+        return True
+    return (third_party_scripts and request.resource_type == "script"
+            and not is_first_party(request.url, first_party_host))
+
+
+async def block_resources(target, site_url):
+    """Installs an abort route on a Playwright async page or context."""
+    first_party_host = _host(site_url).removeprefix("www.")
+
+    async def handle(route):
+        if should_block(route.request, first_party_host):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await target.route("**/*", handle)
+
+
+class Interceptor:
+    """Async route handler: aborts junk, answers repeat GETs from memory, counts bytes.
+
+    Every allowed request is fetched through the route, so `bytes` is the exact
+    body size transferred for the page loads it was attached to.
+    """
+
+    def __init__(self, site_url, third_party_scripts=True):
+        self.first_party_host = _host(site_url).removeprefix("www.")
+        self.third_party_scripts = third_party_scripts
+        self.cache = {}
+        self.requests = 0
+        self.blocked = 0
+        self.cache_hits = 0
+        self.bytes = 0
+
+    async def attach(self, target):
+        await target.route("**/*", self.handle)
+
+    async def handle(self, route):
+        request = route.request
+        self.requests += 1
+        if should_block(request, self.first_party_host, self.third_party_scripts):
+            self.blocked += 1
+            await route.abort()
+            return
+        cacheable = request.method == "GET" and request.resource_type in CACHEABLE_TYPES
+        cached = self.cache.get(request.url) if cacheable else None
+        if cached is not None:
+            self.cache_hits += 1
+            await route.fulfill(status=cached[0], headers=cached[1], body=cached[2])
+            return
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            await route.abort()
+            return
+        self.bytes += len(body)
+        if cacheable and response.status == 200:
+            self.cache[request.url] = (response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    def report(self):
+        return (f"{self.bytes / 1024:.0f} KB transferred, {self.requests} requests "
+                f"({self.blocked} blocked, {self.cache_hits} from cache)")
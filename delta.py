@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import time
+
+import metrics
+import output
+import probecache
+
+# Delta re-validation: probe what changed, re-check the rest on a rotation.
+# A URL with no stored probe result is new (or an entry whose URL changed, or
+# one a cold probe store lost) and is probed right away. Everything else reuses
+# its stored result, except the 1/SLICES of URLs whose hash
+# falls in this run's slice; the slice advances each run, so every stored result
+# is re-verified within SLICES runs and the probes per run track the rate of
+# change instead of the catalogue size. A failed result is only reused while it
+# is younger than the probe cache's negative TTL, so a dead stream is retried as
+# soon as the cache would retry it rather than a whole rotation later.
+#
+#   plan = delta.Delta("plutotv", cache)
+#   Checker(..., cache=cache, delta=plan) ... ; plan.finish()
+
+STATE_PATH = os.path.join(".cache", "delta.json")
+SLICES = 8
+
+
+def _load(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Delta:
+    """Per-run plan of which URLs to probe; `known()` is asked by linkcheck.Checker."""
+
+    def __init__(self, name, cache, slices=SLICES, state_path=STATE_PATH):
+        self.name = name
+        self.cache = cache
+        self.slices = slices
+        self.state_path = state_path
+        self.run = _load(state_path).get(name, 0)
+        self.turn = self.run % slices
+        self.new = self.rotated = self.retried = self.reused = 0
+
+    def slice_of(self, url):
+        digest = hashlib.blake2b(probecache.normalize_url(url).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % self.slices
+
+    def known(self, url, strategy, now=None):
+        """Returns the (ok, status, latency, mbps, checked_at) to reuse, or None to probe now."""
+        row = self.cache.last(url, strategy) if self.cache is not None else None
+        if row is None:
+            self.new += 1
+            metrics.add("delta_new")
+            return None
+        if self.slice_of(url) == self.turn:
+            self.rotated += 1
+            metrics.add("delta_rotated")
+            return None
+        if not row[0] and (now or time.time()) - row[4] > self.cache.negative_ttl:
+            self.retried += 1
+            metrics.add("delta_retried")
+            return None
+        self.reused += 1
+        metrics.add("delta_reused")
+        return row
+
+    def finish(self):
+        """Advances the rotation; call once the run's output has been written."""
+        state = _load(self.state_path)
+        state[self.name] = self.run + 1
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        output.write_atomic(self.state_path, json.dumps(state, indent=1, sort_keys=True).encode("utf-8"))
+
+    def report(self):
+        return (f"🔁 Delta: {self.new} new or changed probed, {self.rotated} re-probed "
+                f"(slice {self.turn + 1}/{self.slices}), {self.retried} failed retried, {self.reused} reused")
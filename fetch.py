@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import time
+
+import requests
+
+import m3u
+import metrics
+import output
+
+# Conditional download of upstream source playlists.
+# Per source the ETag, Last-Modified and a sha256 of the body are kept in
+# FETCH_DIR next to the body itself. The next fetch sends If-None-Match /
+# If-Modified-Since; a 304, or a 200 whose body hashes the same, reports the
+# source as unchanged so the script can keep its previous output untouched.
+# The validators are only saved by commit(), after the script has written its
+# output, so a run that fails halfway is redone in full next time. With max_age
+# an unchanged source still counts as changed once the last commit is that old,
+# for scripts whose output also depends on something else (e.g. probe results).
+#
+#   fetched = fetch.fetch(URL, "pxl", session)
+#   if not fetched.changed and os.path.exists(OUTPUT): return
+#   ... m3u.parse(fetched.path) ...
+#   fetched.commit()
+
+FETCH_DIR = os.path.join(".cache", "fetch")
+
+try:
+    import brotli  # noqa: F401  urllib3 decodes br responses when it is installed
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+def _load(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Fetched:
+    """Result of fetch(): `path` holds the current body, `changed` says whether it moved."""
+
+    def __init__(self, name, path, changed, status, state, folder):
+        self.name = name
+        self.path = path
+        self.changed = changed
+        self.status = status
+        self.state = state
+        self.folder = folder
+
+    def commit(self):
+        """Records the validators, so the next fetch can be answered with a 304."""
+        self.state["processed_at"] = time.time()
+        data = json.dumps(self.state, indent=1, sort_keys=True).encode("utf-8")
+        output.write_atomic(os.path.join(self.folder, f"{self.name}.json"), data)
+
+    def __repr__(self):
+        return f"Fetched({self.name!r}, status={self.status}, changed={self.changed})"
+
+
+def fetch(url, name, session=requests, headers=None, timeout=30, force=False, max_age=None,
+          folder=FETCH_DIR):
+    """Downloads url into folder/<name>.body unless the stored copy is still current.
+
+    force=True skips the conditional headers but still reports an identical
+    body as unchanged. HTTP errors raise like response.raise_for_status().
+    """
+    os.makedirs(folder, exist_ok=True)
+    body_path = os.path.join(folder, f"{name}.body")
+    state = _load(os.path.join(folder, f"{name}.json"))
+    if state.get("url") != url or not os.path.exists(body_path):
+        state = {}
+    processed_at = state.get("processed_at")
+    expired = max_age is not None and (processed_at is None or time.time() - processed_at >= max_age)
+
+    request_headers = dict(headers or {})
+    request_headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)
+    if not force:
+        if state.get("etag"):
+            request_headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            request_headers["If-Modified-Since"] = state["last_modified"]
+
+    with metrics.stage("fetch"):
+        response = session.get(url, headers=request_headers, timeout=timeout, stream=True)
+        with response:
+            if response.status_code == 304 and state:
+                state["checked_at"] = time.time()
+                metrics.add("source_unchanged")
+                return Fetched(name, body_path, expired, 304, state, folder)
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            tmp = f"{body_path}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    for chunk in metrics.counted(response.iter_content(m3u.CHUNK_SIZE)):
+                        f.write(chunk)
+                        digest.update(chunk)
+                sha256 = digest.hexdigest()
+                changed = sha256 != state.get("sha256")
+                if changed:
+                    os.replace(tmp, body_path)
+                else:
+                    os.remove(tmp)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+    if not changed:
+        metrics.add("source_unchanged")
+    now = time.time()
+    state = {"url": url, "etag": response.headers.get("ETag"),
+             "last_modified": response.headers.get("Last-Modified"),
+             "sha256": sha256, "fetched_at": now, "checked_at": now, "processed_at": processed_at}
+    return Fetched(name, body_path, changed or expired, response.status_code, state, folder)
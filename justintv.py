@@ -1,37 +1,46 @@
+import asyncio
 import re
-import sys
-import requests
-from datetime import datetime, timedelta
+import time
 from urllib.parse import urlparse, parse_qs, urljoin
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+
+import browser
+import linkcheck
+import m3u
+import metrics
+import normalize
+import output
 
 # Constants
 JUSTINTV_DOMAIN = "https://tvjustin.com/"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36"
 FIXED_GROUP_TITLE = "JUSTIN TV LIVE SPORTS"
+OUTPUT_FILE = "justintv.m3u8"
+MAX_CHECKS = 20  # Concurrent HEAD checks against the stream host
+STREAM_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Referer": JUSTINTV_DOMAIN,
+    "Origin": JUSTINTV_DOMAIN.rstrip('/')
+}
 
 def adjust_time_in_text(text, hours_to_add=5):
     """Finds HH:MM patterns in text and adds specified hours."""
-    def time_replacer(match):
-        time_str = match.group(0)
-        try:
-            time_obj = datetime.strptime(time_str, "%H:%M")
-            new_time = time_obj + timedelta(hours=hours_to_add)
-            return new_time.strftime("%H:%M")
-        except ValueError:
-            return time_str
-
-    return re.sub(r'\d{2}:\d{2}', time_replacer, text)
-
-def scrape_default_channel_info(page):
+    return normalize.time_shifter(hours_to_add)(text)
+
+async def open_page(page, url, timeout, selector):
+    """Navigates only if the page is not already on url, then waits for selector."""
+    if page.url != url:
+        await page.goto(url, timeout=timeout, wait_until='domcontentloaded')
+    await page.wait_for_selector(selector, state='attached', timeout=15000)
+
+async def scrape_default_channel_info(page):
     try:
-        page.goto(JUSTINTV_DOMAIN, timeout=25000, wait_until='domcontentloaded')
         iframe_selector = "iframe#customIframe"
-        page.wait_for_selector(iframe_selector, timeout=15000)
-        iframe_element = page.query_selector(iframe_selector)
+        await open_page(page, JUSTINTV_DOMAIN, 25000, iframe_selector)
+        iframe_element = await page.query_selector(iframe_selector)
         if not iframe_element: return None, None
         
-        iframe_src = iframe_element.get_attribute('src')
+        iframe_src = await iframe_element.get_attribute('src')
         event_url = urljoin(JUSTINTV_DOMAIN, iframe_src)
         parsed_event_url = urlparse(event_url)
         query_params = parse_qs(parsed_event_url.query)
@@ -40,111 +49,151 @@ def scrape_default_channel_info(page):
     except Exception:
         return None, None
 
-def extract_base_m3u8_url(page, event_url):
+async def extract_base_m3u8_url(page, event_url):
     try:
-        page.goto(event_url, timeout=20000, wait_until="domcontentloaded")
-        content = page.content()
+        if page.url != event_url:
+            await page.goto(event_url, timeout=20000, wait_until="domcontentloaded")
+        content = await page.content()
         base_url_match = re.search(r"['\"](https?://[^'\"]+/checklist/)['\"]", content)
         return base_url_match.group(1) if base_url_match else None
     except Exception:
         return None
 
-def is_link_working(url):
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Referer": JUSTINTV_DOMAIN,
-        "Origin": JUSTINTV_DOMAIN.rstrip('/')
-    }
-    try:
-        response = requests.head(url, headers=headers, timeout=5)
-        return response.status_code == 200
-    except Exception:
-        return False
+# Reads every tile in one round-trip instead of five IPC calls per element
+EXTRACT_CHANNELS_JS = """
+    elements => elements.map(el => {
+        const name = el.querySelector(".takimlar");
+        const time = el.querySelector(".saat");
+        return {
+            data_url: el.getAttribute("data-url"),
+            name: name ? name.innerText : null,
+            time: time ? time.innerText : "",
+        };
+    })
+"""
 
-def scrape_all_channels(page):
-    print(f"\n📡 Collecting channels from {JUSTINTV_DOMAIN}...")
+def parse_channel_records(records):
+    """Turns {data_url, name, time} tile records into sorted, de-duplicated channels."""
     channels = []
     seen_ids = set()
     
-    try:
-        page.goto(JUSTINTV_DOMAIN, timeout=45000, wait_until='networkidle')
-        page.wait_for_timeout(3000)
-        channel_elements = page.query_selector_all(".mac[data-url]")
+    for record in records:
+        data_url = record.get('data_url')
+        if not data_url: continue
         
-        for element in channel_elements:
-            data_url = element.get_attribute('data-url')
-            if not data_url: continue
+        parsed_data_url = urlparse(data_url)
+        stream_id = parse_qs(parsed_data_url.query).get('id', [None])[0]
+        
+        if stream_id and stream_id not in seen_ids:
+            name = record.get('name')
+            channel_name = name.replace('CANLI', '').strip() if name is not None else "Unknown"
+            time_str = (record.get('time') or "").strip()
             
-            parsed_data_url = urlparse(data_url)
-            stream_id = parse_qs(parsed_data_url.query).get('id', [None])[0]
+            # Apply the +5 hours offset and format the title with time first
+            if time_str and time_str != "CANLI":
+                adjusted_time = adjust_time_in_text(time_str, 5)
+                final_name = f"[{adjusted_time}] {channel_name}"
+            else:
+                final_name = channel_name
             
-            if stream_id and stream_id not in seen_ids:
-                name_element = element.query_selector(".takimlar")
-                channel_name = name_element.inner_text().replace('CANLI', '').strip() if name_element else "Unknown"
-                
-                time_element = element.query_selector(".saat")
-                time_str = time_element.inner_text().strip() if time_element else ""
-                
-                # Apply the +5 hours offset and format the title with time first
-                if time_str and time_str != "CANLI":
-                    adjusted_time = adjust_time_in_text(time_str, 5)
-                    final_name = f"[{adjusted_time}] {channel_name}"
-                else:
-                    final_name = channel_name
-                
-                channels.append({
-                    'name': final_name,
-                    'id': stream_id
-                })
-                seen_ids.add(stream_id)
-
-        # Sort alphabetically (which now effectively sorts by time for match entries)
-        channels.sort(key=lambda x: x['name'])
-        return channels
+            channels.append({
+                'name': final_name,
+                'id': stream_id
+            })
+            seen_ids.add(stream_id)
+
+    # Sort alphabetically (which now effectively sorts by time for match entries)
+    channels.sort(key=lambda x: x['name'])
+    return channels
+
+async def scrape_all_channels(page):
+    print(f"\n📡 Collecting channels from {JUSTINTV_DOMAIN}...")
+    
+    try:
+        await open_page(page, JUSTINTV_DOMAIN, 45000, ".mac[data-url]")
+        records = await page.eval_on_selector_all(".mac[data-url]", EXTRACT_CHANNELS_JS)
+        return parse_channel_records(records)
     except Exception as e:
         print(f"Error during scraping: {e}")
         return []
 
-def main():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(user_agent=USER_AGENT)
-        page = context.new_page()
+async def scrape(page):
+    """Runs all page work on one page: the home page is loaded once for both the
+    default event and the channel list, then the event page for the stream base."""
+    interceptor = browser.Interceptor(JUSTINTV_DOMAIN, third_party_scripts=False)
+    await interceptor.attach(page)
+    start = time.perf_counter()
 
-        default_event_url, _ = scrape_default_channel_info(page)
-        if not default_event_url: 
-            sys.exit(1)
+    with metrics.stage("browser_navigation"):
+        default_event_url, _ = await scrape_default_channel_info(page)
+        if not default_event_url:
+            return None, []
 
-        base_m3u8_url = extract_base_m3u8_url(page, default_event_url)
-        if not base_m3u8_url: 
-            sys.exit(1)
+        channels = await scrape_all_channels(page)
 
-        channels = scrape_all_channels(page)
-        
-        output_filename = "justintv.m3u8"
-        count = 0
-        
-        with open(output_filename, "w", encoding="utf-8") as f:
-            f.write("#EXTM3U\n\n")
-            
-            for c in channels:
-                stream_url = f"{base_m3u8_url}{c['id']}.m3u8"
-                
-                print(f"🔍 Validating: {c['name']}...", end=" ", flush=True)
-                
-                if is_link_working(stream_url):
-                    print("✅ 200 OK")
-                    f.write(f'#EXTINF:-1 tvg-name="{c["name"]}" group-title="{FIXED_GROUP_TITLE}",{c["name"]}\n')
-                    f.write(f"#EXT-X-USER-AGENT:{USER_AGENT}\n")
-                    f.write(f"#EXT-X-REFERER:{JUSTINTV_DOMAIN}\n")
-                    f.write(f"#EXT-X-ORIGIN:{JUSTINTV_DOMAIN.rstrip('/')}\n")
-                    f.write(f"{stream_url}\n\n")
-                    count += 1
-                else:
-                    print("❌ Offline")
-        
-        print(f"\n✅ Finished! {count} live channels saved. Format: [TIME] NAME.")
-        browser.close()
+        base_m3u8_url = await extract_base_m3u8_url(page, default_event_url)
+
+    metrics.add("browser_bytes", interceptor.bytes)
+    metrics.add("channels", len(channels))
+    print(f"⏱️ Scraped in {time.perf_counter() - start:.1f}s, {interceptor.report()}")
+    return base_m3u8_url, channels
+
+async def validate(channels, base_m3u8_url):
+    """HEAD-checks every stream concurrently and returns the live ones as entries."""
+    options = [
+        f"#EXT-X-USER-AGENT:{USER_AGENT}",
+        f"#EXT-X-REFERER:{JUSTINTV_DOMAIN}",
+        f"#EXT-X-ORIGIN:{JUSTINTV_DOMAIN.rstrip('/')}",
+    ]
+    urls = [f"{base_m3u8_url}{c['id']}.m3u8" for c in channels]
+    print(f"🔍 Validating {len(urls)} channels...")
+    checker = linkcheck.Checker(
+        strategy=linkcheck.HEAD,
+        head_fallback=False,
+        timeout=5,
+        max_in_flight=MAX_CHECKS,
+        per_host=MAX_CHECKS,
+        headers=STREAM_HEADERS,
+    )
+    with metrics.stage("probe"):
+        async with checker:
+            results = await checker.check_many(urls)
+    
+    live = []
+    for c, stream_url, result in zip(channels, urls, results):
+        if result.status == 200:
+            print(f"✅ 200 OK   {c['name']}")
+            attrs = {"tvg-name": c["name"], "group-title": FIXED_GROUP_TITLE}
+            live.append(m3u.Entry(c["name"], stream_url, attrs, options))
+        else:
+            print(f"❌ Offline  {c['name']}")
+    return live
+
+async def scrape_with(chromium):
+    context = await chromium.new_context(user_agent=USER_AGENT)
+    try:
+        return await scrape(await context.new_page())
+    finally:
+        await context.close()
+
+@metrics.instrument("justintv", OUTPUT_FILE)
+async def main(chromium=None):
+    """A caller-owned `chromium` browser is used as is and left open."""
+    if chromium is None:
+        async with async_playwright() as p:
+            chromium = await p.chromium.launch(headless=True)
+            base_m3u8_url, channels = await scrape_with(chromium)
+            # Nothing below needs the browser
+            await chromium.close()
+    else:
+        base_m3u8_url, channels = await scrape_with(chromium)
+
+    if not base_m3u8_url:
+        raise RuntimeError(f"no stream base URL found on {JUSTINTV_DOMAIN}")
+
+    live = await validate(channels, base_m3u8_url)
+    count, _ = output.write_playlist(live, OUTPUT_FILE)
+    print(f"\n✅ Finished! {count} live channels saved. Format: [TIME] NAME.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -0,0 +1,290 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import metrics
+
+# Shared stream liveness checker.
+# One aiohttp session keeps per-host keep-alive pools; a global semaphore caps the
+# total number of probes in flight and a semaphore per host stops a single origin
+# from being flooded. Probe cache reads and writes are SQLite calls that may wait
+# on another process's lock, so they run on one worker thread off the event loop.
+
+HEAD = "head"      # HEAD request, status only
+RANGE = "range"    # GET with a small Range header, status only
+SAMPLE = "sample"  # GET and read the first N bytes to measure throughput
+ADAPTIVE = "adaptive"  # like SAMPLE, but stop as soon as the estimate has settled
+
+# Adaptive sampling re-estimates every ADAPTIVE_STEP bytes or ADAPTIVE_INTERVAL seconds.
+# It stops once the last three estimates agree within ADAPTIVE_TOLERANCE, or once the
+# stream has stayed below ADAPTIVE_GIVE_UP x min_mbps for ADAPTIVE_GIVE_UP_AFTER seconds.
+ADAPTIVE_STEP = 32 * 1024
+ADAPTIVE_INTERVAL = 0.25
+ADAPTIVE_MIN_BYTES = 64 * 1024
+ADAPTIVE_TOLERANCE = 0.1
+ADAPTIVE_GIVE_UP = 0.5
+ADAPTIVE_GIVE_UP_AFTER = 1.0
+
+OK_STATUS = (200, 206)
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) VLC/3.0.18"
+
+
+class Result:
+    """Outcome of one probe.
+
+    latency is the time to response headers and ttfb the time to the first body
+    byte; throughput is the sustained rate after that first byte, while mbps is the
+    verdict figure (bytes over total time for a full sample_size download).
+    nbytes is the body read: the sample, up to range_bytes for RANGE, none for HEAD.
+    """
+
+    __slots__ = ("url", "ok", "status", "latency", "nbytes", "mbps", "error", "cached",
+                 "ttfb", "throughput")
+
+    def __init__(self, url, ok=False, status=None, latency=None, nbytes=0, mbps=None, error=None,
+                 cached=False, ttfb=None, throughput=None):
+        self.url = url
+        self.ok = ok
+        self.status = status
+        self.latency = latency
+        self.nbytes = nbytes
+        self.mbps = mbps
+        self.error = error
+        self.cached = cached
+        self.ttfb = ttfb
+        self.throughput = throughput
+
+    def __repr__(self):
+        return f"Result({self.url!r}, ok={self.ok}, status={self.status})"
+
+
+class Checker:
+    """Async liveness checker; use as `async with Checker(...) as checker`."""
+
+    def __init__(self, strategy=HEAD, timeout=5, max_in_flight=64, per_host=16,
+                 headers=None, range_bytes=1024, sample_size=500000, min_bytes=1000,
+                 min_mbps=None, head_fallback=True, session=None, cache=None, delta=None):
+        self.strategy = strategy
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_in_flight = max_in_flight
+        self.per_host = per_host
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.range_bytes = range_bytes
+        self.sample_size = sample_size
+        self.min_bytes = min_bytes
+        self.min_mbps = min_mbps
+        self.head_fallback = head_fallback
+        self.session = session
+        self.cache = cache
+        self.delta = delta  # delta.Delta: decides what to re-probe instead of the cache TTLs
+        self._own_session = session is None
+        self._in_flight = None
+        self._hosts = {}
+        self._db = None
+
+    async def __aenter__(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                ssl=False,
+                limit=self.max_in_flight,
+                limit_per_host=self.per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+            )
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        if self.cache is not None or self.delta is not None:
+            self._db = ThreadPoolExecutor(1, thread_name_prefix="probecache")
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._db is not None:
+            self._db.shutdown()
+            self._db = None
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _host_sem(self, url):
+        host = urlsplit(url).netloc
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def check(self, url, headers=None):
+        """Probes one URL, answering from the probe cache when it has a fresh result.
+
+        With a delta the cache TTLs are not used; the delta decides whether the
+        stored result is reused or the URL is probed again.
+        """
+        if self.delta is not None:
+            cached = await self._in_db_thread(self.delta.known, url, self.strategy)
+        elif self.cache is not None:
+            cached = await self._in_db_thread(self.cache.get, url, self.strategy)
+        else:
+            cached = None
+        if cached is not None:
+            ok, status, latency, mbps, _ = cached
+            metrics.add("probes_cached")
+            return Result(url, ok, status, latency, mbps=mbps, cached=True)
+        result = await self._probe(url, headers)
+        metrics.add("probes_ok" if result.ok else "probes_failed")
+        metrics.add("bytes_probed", result.nbytes)
+        metrics.observe_probe(url, result.latency)
+        if self.cache is not None:
+            await self._in_db_thread(self.cache.put, url, self.strategy, result.ok,
+                                     result.status, result.latency, result.mbps)
+        return result
+
+    async def _in_db_thread(self, func, *args):
+        # run_in_executor does not carry ContextVars over; Delta.known records metrics
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._db, context.run, func, *args)
+
+    async def _probe(self, url, headers=None):
+        if not self._own_session:
+            # A shared session was not built with our default headers
+            headers = {**self.headers, **(headers or {})}
+        async with self._host_sem(url), self._in_flight:
+            start = time.perf_counter()
+            try:
+                if self.strategy in (SAMPLE, ADAPTIVE):
+                    return await self._sample(url, headers, start, self.strategy == ADAPTIVE)
+                if self.strategy == HEAD:
+                    result = await self._status(url, "HEAD", headers, start)
+                    if result.ok or not self.head_fallback or result.status not in (403, 405, 501):
+                        return result
+                    start = time.perf_counter()
+                return await self._status(url, "GET", headers, start, ranged=True)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                return Result(url, latency=time.perf_counter() - start, error=type(e).__name__)
+
+    async def _status(self, url, method, headers, start, ranged=False):
+        if ranged:
+            headers = {**(headers or {}), "Range": f"bytes=0-{self.range_bytes - 1}"}
+        async with self.session.request(method, url, headers=headers, timeout=self.timeout,
+                                        allow_redirects=True) as r:
+            latency = time.perf_counter() - start
+            nbytes = 0
+            if ranged and r.status in OK_STATUS:
+                # Read for bytes_probed; a server ignoring Range is not read past range_bytes
+                async for chunk in r.content.iter_chunked(self.range_bytes):
+                    nbytes += len(chunk)
+                    if nbytes >= self.range_bytes:
+                        break
+            return Result(url, r.status in OK_STATUS, r.status, latency, nbytes)
+
+    def _full_sample_mbps(self, ttfb, first_len, throughput):
+        """Mbps a full sample_size download would score at this TTFB and sustained rate."""
+        if not throughput:
+            return 0.0
+        rest = (self.sample_size - first_len) * 8 / 1000000
+        return self.sample_size * 8 / 1000000 / (ttfb + rest / throughput)
+
+    def _settled(self, estimates, nbytes, body_time):
+        estimate = estimates[-1]
+        if self.min_mbps is not None:
+            if body_time >= ADAPTIVE_GIVE_UP_AFTER and estimate < self.min_mbps * ADAPTIVE_GIVE_UP:
+                return True
+            # Too close to the threshold to call yet; keep reading up to sample_size
+            if abs(estimate - self.min_mbps) <= ADAPTIVE_TOLERANCE * self.min_mbps:
+                return False
+        if nbytes < ADAPTIVE_MIN_BYTES or len(estimates) < 3:
+            return False
+        last = estimates[-3:]
+        return max(last) - min(last) <= ADAPTIVE_TOLERANCE * (sum(last) / 3)
+
+    async def _sample(self, url, headers, start, adaptive=False):
+        async with self.session.get(url, headers=headers, timeout=self.timeout) as r:
+            latency = time.perf_counter() - start
+            if r.status != 200:
+                return Result(url, False, r.status, latency)
+            nbytes = first_len = 0
+            first = ttfb = throughput = None
+            estimates = []
+            next_check = ADAPTIVE_STEP
+            last_check = 0.0
+            settled = False
+            while nbytes < self.sample_size:
+                chunk = await r.content.read(self.sample_size - nbytes)
+                if not chunk:
+                    break
+                now = time.perf_counter()
+                if first is None:
+                    first, ttfb, first_len = now, now - start, len(chunk)
+                nbytes += len(chunk)
+                body_time = now - first
+                if body_time > 0 and nbytes > first_len:
+                    throughput = (nbytes - first_len) * 8 / body_time / 1000000
+                if not adaptive or throughput is None:
+                    continue
+                if nbytes >= next_check or body_time - last_check >= ADAPTIVE_INTERVAL:
+                    next_check = nbytes + ADAPTIVE_STEP
+                    last_check = body_time
+                    estimates.append(self._full_sample_mbps(ttfb, first_len, throughput))
+                    if self._settled(estimates, nbytes, body_time):
+                        settled = True
+                        break
+            elapsed = time.perf_counter() - start
+            if settled:
+                mbps = estimates[-1]
+            else:
+                mbps = nbytes * 8 / elapsed / 1000000 if elapsed > 0 else 0.0
+            ok = nbytes > self.min_bytes and (self.min_mbps is None or mbps >= self.min_mbps)
+            return Result(url, ok, r.status, latency, nbytes, mbps, ttfb=ttfb, throughput=throughput)
+
+    async def check_many(self, urls, headers=None):
+        """Checks every URL concurrently and returns results in input order."""
+        return await asyncio.gather(*(self.check(url, headers) for url in urls))
+
+
+_DONE = object()
+
+
+async def run_queue(items, handle, workers, backlog=None):
+    """Runs `handle(item)` on `workers` coroutines fed lazily from `items`.
+
+    `items` may be a plain or an async iterable. Only `backlog` items are ever
+    queued, so memory stays flat no matter how long the iterable is. The first
+    exception from a worker cancels the rest.
+    """
+    queue = asyncio.Queue(maxsize=backlog or workers * 2)
+
+    async def feed():
+        if hasattr(items, "__aiter__"):
+            async for item in items:
+                await queue.put(item)
+        else:
+            for item in items:
+                await queue.put(item)
+        for _ in range(workers):
+            await queue.put(_DONE)
+
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            await handle(item)
+
+    tasks = [asyncio.ensure_future(feed())] + [asyncio.ensure_future(work()) for _ in range(workers)]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        task.result()
+
+
+async def _check_urls(urls, options):
+    async with Checker(**options) as checker:
+        return await checker.check_many(urls)
+
+
+def check_urls(urls, **options):
+    """Blocking helper for the sync scripts: checks all URLs and returns ordered results."""
+    return asyncio.run(_check_urls(list(urls), options))
@@ -0,0 +1,224 @@
+import io
+import os
+import re
+from functools import lru_cache
+
+# Shared M3U/M3U8 reader and writer.
+# The parser works on a byte stream (file, HTTP response chunks, bytes) one line at
+# a time, so even multi-MB playlists like tsn1.m3u8 never sit in memory as a whole.
+
+HEADER = "#EXTM3U"
+CHUNK_SIZE = 1 << 16
+WRITE_BATCH = 256  # Entries joined into one write() by write()
+
+ATTR_RE = re.compile(rb'([\w-]+)="([^"]*)"')
+
+
+# "#EXTINF:<duration> <attrs>," up to the first comma that is not inside quotes
+HEAD_RE = re.compile(rb'[^,"]*(?:"[^"]*"[^,"]*)*,')
+
+
+def find_title_comma(line, start=0):
+    """Returns the index of the comma that separates attributes from the title."""
+    match = HEAD_RE.match(line, start)
+    if match is None:
+        return line.find(b",", start)
+    return match.end() - 1
+
+
+# set_attr is called once per entry with the same few names and values, so the
+# encoded forms are memoized
+@lru_cache(maxsize=4096)
+def _quote(value):
+    if not isinstance(value, str):
+        value = str(value)
+    return value.replace('"', "'").encode("utf-8")
+
+
+@lru_cache(maxsize=256)
+def _attr_key(name):
+    return name.encode("utf-8") + b'="'
+
+
+class Entry:
+    """One playlist channel.
+
+    The #EXTINF line is kept as raw bytes; attributes are only tokenized the first
+    time one is read, and set_attr() splices the new value into the bytes directly.
+    """
+
+    __slots__ = ("raw", "_attrs", "options", "url")
+
+    def __init__(self, title, url="", attrs=None, options=None, duration="-1"):
+        head = f"#EXTINF:{duration}".encode("utf-8")
+        if attrs:
+            head += b"".join(b" %s=\"%s\"" % (k.encode("utf-8"), _quote(v)) for k, v in attrs.items())
+        self.raw = head + b"," + title.encode("utf-8")
+        self._attrs = None
+        self.options = list(options) if options else ()
+        self.url = url
+
+    @classmethod
+    def from_raw(cls, raw):
+        entry = cls.__new__(cls)
+        entry.raw = raw
+        entry._attrs = None
+        entry.options = ()
+        entry.url = ""
+        return entry
+
+    def _comma(self):
+        comma = find_title_comma(self.raw, 8)
+        return len(self.raw) if comma == -1 else comma
+
+    @property
+    def attrs(self):
+        if self._attrs is None:
+            head = self.raw[8:self._comma()]
+            self._attrs = {k.decode("utf-8", "replace"): v.decode("utf-8", "replace")
+                           for k, v in ATTR_RE.findall(head)}
+        return self._attrs
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    def set_attr(self, name, value):
+        """Sets an attribute in place, adding it before the title if it is missing."""
+        raw = self.raw
+        key = _attr_key(name)
+        value_bytes = _quote(value)
+        pos = raw.find(key, 8)
+        # Skip matches that are only the tail of a longer name (x-group-title=)
+        while pos != -1 and raw[pos - 1] not in b" :\t":
+            pos = raw.find(key, pos + 1)
+        # No comma before the match means it is inside the attribute section;
+        # only fall back to the quote-aware scan when there is one.
+        if pos != -1 and raw.find(b",", 8, pos) == -1:
+            comma = len(raw)
+        else:
+            comma = self._comma()
+            if pos > comma:
+                pos = -1
+        if pos == -1:
+            self.raw = b"%s %s%s\"%s" % (raw[:comma], key, value_bytes, raw[comma:])
+        else:
+            start = pos + len(key)
+            end = raw.find(b'"', start, comma)
+            if end == -1:
+                end = comma
+            self.raw = raw[:start] + value_bytes + raw[end:]
+        if self._attrs is not None:
+            self._attrs[name] = str(value)
+
+    @property
+    def title(self):
+        comma = self._comma()
+        return self.raw[comma + 1:].strip().decode("utf-8", "replace")
+
+    @title.setter
+    def title(self, value):
+        self.raw = self.raw[:self._comma()] + b"," + value.encode("utf-8")
+
+    @property
+    def duration(self):
+        return self.raw[8:self._comma()].split(b" ", 1)[0].strip().decode() or "-1"
+
+    @property
+    def group(self):
+        return self.get("group-title", "")
+
+    @property
+    def extinf(self):
+        return self.raw.decode("utf-8", "replace")
+
+    def lines(self):
+        yield self.extinf
+        yield from self.options
+        yield self.url
+
+    def to_bytes(self):
+        if not self.options:
+            return b"%s\n%s\n" % (self.raw, self.url.encode("utf-8"))
+        return "\n".join(self.lines()).encode("utf-8") + b"\n"
+
+    def __repr__(self):
+        return f"Entry({self.title!r}, {self.url!r})"
+
+
+def _split_chunks(chunks):
+    tail = b""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def iter_lines(source):
+    """Yields raw byte lines from a path, bytes, binary file or iterable of byte chunks."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from f
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield from io.BytesIO(source)
+    elif isinstance(source, io.IOBase):
+        yield from source
+    elif hasattr(source, "read"):
+        yield from _split_chunks(iter(lambda: source.read(CHUNK_SIZE), b""))
+    else:
+        yield from _split_chunks(source)
+
+
+def is_option(line):
+    return line.startswith(b"#KODIPROP") or (
+        line.startswith(b"#EXT") and not line.startswith(b"#EXTM3U")
+    )
+
+
+def parse(source, prefilter=None):
+    """Yields an Entry for every #EXTINF block that ends in a URL line.
+
+    prefilter(raw_extinf_bytes) -> bool can reject a block before any of it is
+    decoded; its options and URL lines are then skipped as well.
+    """
+    current = None
+    for raw in iter_lines(source):
+        line = raw.strip()
+        if not line:
+            continue
+        if line[:1] == b"#":
+            if line.startswith(b"#EXTINF"):
+                current = Entry.from_raw(line) if prefilter is None or prefilter(line) else None
+            elif current is not None and is_option(line):
+                if not current.options:
+                    current.options = []
+                current.options.append(line.decode("utf-8", "replace"))
+            continue
+        if current is not None:
+            current.url = line.decode("utf-8", "replace")
+            yield current
+            current = None
+
+
+def write(entries, f, header=HEADER):
+    """Writes entries to a binary file and returns how many were written."""
+    count = 0
+    f.write(header.encode("utf-8") + b"\n")
+    # One write per batch instead of per entry
+    batch = []
+    for entry in entries:
+        batch.append(entry.to_bytes())
+        if len(batch) == WRITE_BATCH:
+            f.write(b"".join(batch))
+            count += len(batch)
+            batch = []
+    f.write(b"".join(batch))
+    return count + len(batch)
+
+
+def dump(entries, path, header=HEADER):
+    with open(path, "wb") as f:
+        return write(entries, f, header)
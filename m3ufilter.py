@@ -0,0 +1,121 @@
+import re
+
+import m3u
+from normalize import trie_pattern
+
+# Declarative channel selection compiled into one predicate.
+# Keyword lists become a single case-insensitive trie regex, user regexes are
+# OR-ed into it, and group/tvg-id lists become sets. Every ASCII requirement is
+# also compiled into a bytes test that m3u.parse runs on the raw #EXTINF line,
+# so blocks that cannot match are dropped before anything is decoded.
+#
+#   STAR = Filter(include=["STAR MOVIES"], exclude_groups=["Adult"])
+#   for entry in STAR.parse(response.iter_content(m3u.CHUNK_SIZE)): ...
+
+TITLE = "title"    # keywords and regexes look at the channel title
+EXTINF = "extinf"  # ...or at the whole #EXTINF line, attributes included
+
+
+def _text_regex(keywords, regexes):
+    parts = []
+    keywords = [k for k in keywords if k]
+    if keywords:
+        parts.append(f"(?i:{trie_pattern(keywords)})")
+    parts.extend(f"(?:{r})" for r in regexes)
+    return re.compile("|".join(parts)) if parts else None
+
+
+def _bytes_contains(words):
+    """Case-insensitive "any word in line" test on raw bytes, or None if a word is not ASCII.
+
+    Words that contain another listed word are dropped; the shorter one is enough.
+    bytes.lower() plus `in` beats an IGNORECASE regex, which loses the literal search.
+    """
+    words = [w for w in words if w]
+    if not words or not all(w.isascii() for w in words):
+        return None
+    words = {w.lower().encode("ascii") for w in words}
+    minimal = [w for w in words if not any(o != w and o in w for o in words)]
+    if len(minimal) == 1:
+        word = minimal[0]
+        return lambda line: word in line.lower()
+    return lambda line: any(w in line.lower() for w in minimal)
+
+
+def _folded(values):
+    return frozenset(v.casefold() for v in values) if values else None
+
+
+class Filter:
+    """Keeps an entry when every given rule holds.
+
+    include / include_regex: the text must contain a keyword or match a regex
+    exclude / exclude_regex: the text must not
+    groups / exclude_groups: group-title must (not) be one of these, ignoring case
+    tvg_ids / exclude_tvg_ids: same for tvg-id
+    schemes: URL prefixes to accept (default http/https; empty accepts anything)
+    match: TITLE or EXTINF, the text keywords and regexes are matched against
+    """
+
+    def __init__(self, include=(), exclude=(), include_regex=(), exclude_regex=(),
+                 groups=(), exclude_groups=(), tvg_ids=(), exclude_tvg_ids=(),
+                 schemes=("http",), match=TITLE):
+        self.match = match
+        self.schemes = tuple(schemes) or None
+        self._include = _text_regex(include, include_regex)
+        self._exclude = _text_regex(exclude, exclude_regex)
+        self.groups = _folded(groups)
+        self.exclude_groups = _folded(exclude_groups)
+        self.tvg_ids = _folded(tvg_ids)
+        self.exclude_tvg_ids = _folded(exclude_tvg_ids)
+
+        # Necessary conditions on the raw line: a required keyword, group or id must
+        # appear in it somewhere. Regex includes could match anything, so they opt out.
+        required = []
+        if include and not include_regex:
+            required.append(_bytes_contains(include))
+        if groups:
+            required.append(_bytes_contains(groups))
+        if tvg_ids:
+            required.append(_bytes_contains(tvg_ids))
+        required = [r for r in required if r is not None]
+        if not required:
+            self.prefilter = None
+        elif len(required) == 1:
+            self.prefilter = required[0]
+        else:
+            self.prefilter = lambda line: all(search(line) for search in required)
+
+    def text_ok(self, text):
+        """Applies only the keyword and regex rules, e.g. to Xtream stream names."""
+        if self._include is not None and self._include.search(text) is None:
+            return False
+        return self._exclude is None or self._exclude.search(text) is None
+
+    def __call__(self, entry):
+        if self.schemes and not entry.url.startswith(self.schemes):
+            return False
+        if self._include is not None or self._exclude is not None:
+            if not self.text_ok(entry.title if self.match == TITLE else entry.extinf):
+                return False
+        if self.groups is not None or self.exclude_groups is not None:
+            group = (entry.get("group-title") or "").casefold()
+            if self.groups is not None and group not in self.groups:
+                return False
+            if self.exclude_groups is not None and group in self.exclude_groups:
+                return False
+        if self.tvg_ids is not None or self.exclude_tvg_ids is not None:
+            tvg_id = (entry.get("tvg-id") or "").casefold()
+            if self.tvg_ids is not None and tvg_id not in self.tvg_ids:
+                return False
+            if self.exclude_tvg_ids is not None and tvg_id in self.exclude_tvg_ids:
+                return False
+        return True
+
+    def select(self, entries):
+        """Lazily keeps the matching entries of an already parsed stream."""
+        return filter(self, entries)
+
+    def parse(self, source):
+        """m3u.parse with the prefilter applied; yields only matching entries."""
+        return filter(self, m3u.parse(source, self.prefilter))
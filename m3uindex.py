@@ -0,0 +1,184 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+
+import m3u
+import output
+
+# Sidecar offset index for the large static playlists.
+# One pass over the file records where every #EXTINF block starts and ends and
+# maps group-title, tvg-id and normalized name to those blocks. Lookups mmap the
+# playlist and hand out memoryview slices of the matching blocks, so pulling one
+# group out of tsn1.m3u8 reads the index and a few pages instead of parsing 3 MB.
+# The index remembers the source's size and mtime and is rebuilt when either moves.
+#
+#   with PlaylistIndex.open("tsn1.m3u8") as index:
+#       for block in index.blocks(group="Albania"): ...
+
+INDEX_DIR = os.path.join(".cache", "m3uindex")
+VERSION = 1
+
+EXTINF_RE = re.compile(rb"^#EXTINF[^\r\n]*", re.M)
+URL_LINE_RE = re.compile(rb"\n[ \t]*[^#\s]")
+
+
+def normalize_name(name):
+    return " ".join(name.casefold().split())
+
+
+def index_path(source):
+    source = os.path.abspath(source)
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:10]
+    return os.path.join(INDEX_DIR, f"{os.path.basename(source)}.{digest}.json")
+
+
+def _stamp(source):
+    st = os.stat(source)
+    return st.st_size, st.st_mtime_ns
+
+
+def build_index(data):
+    """Scans playlist bytes (or an mmap) once and returns the index dict, without the stamp."""
+    starts, ends = [], []
+    groups, tvg_ids, names = {}, {}, {}
+    matches = EXTINF_RE.finditer(data)
+    match = next(matches, None)
+    while match is not None:
+        following = next(matches, None)
+        start = match.start()
+        end = following.start() if following is not None else len(data)
+        # A block without a URL line is not an entry (m3u.parse skips it too)
+        if URL_LINE_RE.search(data, match.end(), end) is not None:
+            entry = m3u.Entry.from_raw(match.group().strip())
+            i = len(starts)
+            starts.append(start)
+            ends.append(end)
+            groups.setdefault(entry.group, []).append(i)
+            tvg_id = (entry.get("tvg-id") or "").strip()
+            if tvg_id:
+                tvg_ids.setdefault(tvg_id.casefold(), []).append(i)
+            names.setdefault(normalize_name(entry.title), []).append(i)
+        match = following
+    return {"version": VERSION, "starts": starts, "ends": ends,
+            "groups": groups, "tvg_ids": tvg_ids, "names": names}
+
+
+class PlaylistIndex:
+    """A playlist mapped into memory plus its offset index; use PlaylistIndex.open()."""
+
+    def __init__(self, source, index, mm):
+        self.source = source
+        self.index = index
+        self.mm = mm
+        self._groups = {k.casefold(): k for k in index["groups"]}
+
+    @classmethod
+    def open(cls, source, rebuild=False):
+        size, mtime_ns = _stamp(source)
+        path = index_path(source)
+        index = None if rebuild else cls._load(path, size, mtime_ns)
+        with open(source, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if index is None:
+            index = build_index(mm)
+            index.update(size=size, mtime_ns=mtime_ns)
+            os.makedirs(INDEX_DIR, exist_ok=True)
+            output.write_atomic(path, json.dumps(index, ensure_ascii=False).encode("utf-8"))
+        return cls(source, index, mm)
+
+    @staticmethod
+    def _load(path, size, mtime_ns):
+        try:
+            with open(path, encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (index.get("version"), index.get("size"), index.get("mtime_ns")) != (VERSION, size, mtime_ns):
+            return None
+        return index
+
+    def __len__(self):
+        return len(self.index["starts"])
+
+    def groups(self):
+        """{group-title: entry count}"""
+        return {group: len(ids) for group, ids in self.index["groups"].items()}
+
+    def lookup(self, group=None, tvg_id=None, name=None):
+        """Entry numbers matching every given key (case-insensitive), in file order."""
+        found = None
+        for ids in (
+            None if group is None else self.index["groups"].get(self._groups.get(group.casefold()), []),
+            None if tvg_id is None else self.index["tvg_ids"].get(tvg_id.strip().casefold(), []),
+            None if name is None else self.index["names"].get(normalize_name(name), []),
+        ):
+            if ids is not None:
+                found = set(ids) if found is None else found & set(ids)
+        return sorted(found) if found is not None else []
+
+    def blocks(self, group=None, tvg_id=None, name=None):
+        """Yields a memoryview over the raw bytes of every matching #EXTINF block."""
+        view = memoryview(self.mm)
+        starts, ends = self.index["starts"], self.index["ends"]
+        for i in self.lookup(group, tvg_id, name):
+            yield view[starts[i]:ends[i]]
+
+    def entries(self, group=None, tvg_id=None, name=None):
+        """Parsed m3u.Entry objects for the matching blocks."""
+        for block in self.blocks(group, tvg_id, name):
+            yield from m3u.parse(block)
+
+    def extract(self, f, group=None, tvg_id=None, name=None, header=m3u.HEADER):
+        """Writes the matching blocks to a binary file as a playlist; returns the count."""
+        f.write(header.encode("utf-8") + b"\n")
+        count = 0
+        for block in self.blocks(group, tvg_id, name):
+            f.write(block)
+            if block[-1:] != b"\n":
+                f.write(b"\n")
+            count += 1
+        return count
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pull entries out of a large playlist through its offset index.")
+    parser.add_argument("playlist")
+    parser.add_argument("--group")
+    parser.add_argument("--tvg-id")
+    parser.add_argument("--name")
+    parser.add_argument("--groups", action="store_true", help="list group-titles with their entry counts")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("-o", "--out", help="write the matches here instead of stdout")
+    args = parser.parse_args()
+
+    with PlaylistIndex.open(args.playlist, args.rebuild) as index:
+        if args.groups:
+            for group, count in sorted(index.groups().items()):
+                print(f"{count:6d}  {group}")
+            return
+        if args.group is None and args.tvg_id is None and args.name is None:
+            parser.error("give --group, --tvg-id and/or --name (or --groups)")
+        if args.out:
+            with open(args.out, "wb") as f:
+                count = index.extract(f, args.group, args.tvg_id, args.name)
+            print(f"✅ {count} entries written to {args.out}", file=sys.stderr)
+        else:
+            index.extract(sys.stdout.buffer, args.group, args.tvg_id, args.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+# Per-run stage timers, counters and per-host probe latency histograms.
+# Nothing is recorded unless a run is active: decorate a script's entry point
+# with @metrics.instrument(name, playlist) and set IPTV_METRICS=json (or
+# json,prom). Every helper starts with one ContextVar lookup and returns when
+# there is no active run, so disabled instrumentation costs next to nothing.
+# The active run follows the context into tasks and asyncio.to_thread, so
+# sources running side by side in the orchestrator keep separate reports.
+
+FORMATS = {f for f in os.environ.get("IPTV_METRICS", "").lower().replace(" ", "").split(",") if f}
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Probe latency histogram bounds, seconds
+
+_current = ContextVar("metrics_run", default=None)
+
+
+def configure(formats):
+    """Sets the report formats ("json", "prom") for runs started from now on."""
+    global FORMATS
+    FORMATS = set(formats)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                break
+        else:
+            i = len(BUCKETS)
+        self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for count in self.counts:
+            running += count
+            yield running
+
+    def to_dict(self):
+        les = [str(b) for b in BUCKETS] + ["+Inf"]
+        return {"count": self.count, "sum": round(self.total, 4),
+                "mean_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+                "buckets": dict(zip(les, self.cumulative()))}
+
+
+class Run:
+    """Everything recorded for one script run."""
+
+    def __init__(self, name, playlist=None):
+        self.name = name
+        self.playlist = playlist
+        self.started = time.time()
+        self.seconds = None
+        self.stages = {}
+        self.counters = {}
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def add_stage(self, name, seconds):
+        with self.lock:
+            stage = self.stages.setdefault(name, [0.0, 0])
+            stage[0] += seconds
+            stage[1] += 1
+
+    def add(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, host, seconds):
+        with self.lock:
+            histogram = self.hosts.get(host)
+            if histogram is None:
+                histogram = self.hosts[host] = Histogram()
+            histogram.observe(seconds)
+
+    def to_dict(self):
+        slowest = sorted(self.hosts.items(), key=lambda item: item[1].total, reverse=True)
+        return {
+            "run": self.name,
+            "playlist": self.playlist,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "stages": {name: {"seconds": round(s, 3), "calls": n} for name, (s, n) in self.stages.items()},
+            "counters": dict(sorted(self.counters.items())),
+            "probe_latency_by_host": {host: h.to_dict() for host, h in slowest},
+        }
+
+    def to_prometheus(self):
+        run = _label(self.name)
+        lines = ["# TYPE iptv_run_seconds gauge", f'iptv_run_seconds{{run="{run}"}} {self.seconds or 0:.3f}',
+                 "# TYPE iptv_stage_seconds_total counter"]
+        for name, (seconds, _) in self.stages.items():
+            lines.append(f'iptv_stage_seconds_total{{run="{run}",stage="{_label(name)}"}} {seconds:.3f}')
+        lines.append("# TYPE iptv_stage_calls_total counter")
+        for name, (_, calls) in self.stages.items():
+            lines.append(f'iptv_stage_calls_total{{run="{run}",stage="{_label(name)}"}} {calls}')
+        lines.append("# TYPE iptv_events_total counter")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'iptv_events_total{{run="{run}",name="{_label(name)}"}} {value}')
+        lines.append("# TYPE iptv_probe_latency_seconds histogram")
+        for host, histogram in self.hosts.items():
+            labels = f'run="{run}",host="{_label(host)}"'
+            for le, count in zip([str(b) for b in BUCKETS] + ["+Inf"], histogram.cumulative()):
+                lines.append(f'iptv_probe_latency_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"iptv_probe_latency_seconds_sum{{{labels}}} {histogram.total:.4f}")
+            lines.append(f"iptv_probe_latency_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def report_paths(self):
+        base = os.path.splitext(self.playlist)[0] if self.playlist else self.name
+        return f"{base}.metrics.json", f"{base}.metrics.prom"
+
+    def write(self, formats):
+        json_path, prom_path = self.report_paths()
+        written = []
+        if "json" in formats:
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=1)
+            written.append(json_path)
+        if "prom" in formats:
+            with open(prom_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            written.append(prom_path)
+        return written
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def current():
+    return _current.get()
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("run", "name", "start")
+
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.run.add_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """Times a block: `with metrics.stage("parse"):` (also fine inside coroutines)."""
+    run = _current.get()
+    return _NULL_STAGE if run is None else _Stage(run, name)
+
+
+def add(name, n=1):
+    run = _current.get()
+    if run is not None:
+        run.add(name, n)
+
+
+def observe_probe(url, seconds):
+    run = _current.get()
+    if run is not None and seconds is not None:
+        run.observe(urlsplit(url).netloc, seconds)
+
+
+def counted(chunks, name="bytes_fetched"):
+    """Passes byte chunks through, adding their sizes to counter `name`."""
+    run = _current.get()
+    if run is None:
+        return chunks
+    return _counted(chunks, run, name)
+
+
+def _counted(chunks, run, name):
+    for chunk in chunks:
+        run.add(name, len(chunk))
+        yield chunk
+
+
+def acounted(chunks, name="bytes_fetched"):
+    """Async counterpart of counted() for aiohttp chunk iterators."""
+    run = _current.get()
+    if run is None:
+        return chunks
+    return _acounted(chunks, run, name)
+
+
+async def _acounted(chunks, run, name):
+    async for chunk in chunks:
+        run.add(name, len(chunk))
+        yield chunk
+
+
+def _start(name, playlist):
+    if not FORMATS:
+        return None, None
+    run = Run(name, playlist)
+    return run, _current.set(run)
+
+
+def _finish(run, token):
+    run.seconds = time.time() - run.started
+    _current.reset(token)
+    for path in run.write(FORMATS):
+        print(f"📊 Metrics written to {path}")
+
+
+def instrument(name, playlist=None):
+    """Decorates a script entry point (sync or async) so each call is one recorded run."""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                run, token = _start(name, playlist)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    if run is not None:
+                        _finish(run, token)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                run, token = _start(name, playlist)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    if run is not None:
+                        _finish(run, token)
+        return wrapper
+    return decorate
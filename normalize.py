@@ -0,0 +1,115 @@
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# Rule-driven title normalization.
+# Removal strings, abbreviation maps and a time shift are compiled into one
+# regular expression; literal sets become a trie-shaped pattern, so a map of
+# hundreds of team names costs about as much per title as a map of ten. Each
+# title is rewritten in a single re.sub pass and the result is memoized.
+
+CACHE_SIZE = 8192
+
+
+def trie_pattern(words):
+    """Regex source matching any of `words`, longest first, shaped as a prefix trie."""
+    trie = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class TimeShift:
+    """Adds `hours` to every match of `pattern`, read and written with `fmt`.
+
+    The default "%H:%M" is shifted with plain arithmetic (wrapping at midnight);
+    any other format goes through datetime, in the current year when the format
+    has no year of its own. Matches that do not parse are left as they are.
+    """
+
+    def __init__(self, hours, pattern=r"\d{2}:\d{2}", fmt="%H:%M"):
+        self.hours = hours
+        self.pattern = pattern
+        self.fmt = fmt
+        self.delta = timedelta(hours=hours)
+
+    def __call__(self, text):
+        if self.fmt == "%H:%M":
+            hh, mm = int(text[:2]), int(text[3:5])
+            if hh > 23 or mm > 59:
+                return text
+            minutes = (hh * 60 + mm + int(self.hours * 60)) % 1440
+            return f"{minutes // 60:02d}:{minutes % 60:02d}"
+        try:
+            if "%Y" in self.fmt:
+                moment = datetime.strptime(text, self.fmt)
+            else:
+                moment = datetime.strptime(f"{text} {datetime.now().year}", f"{self.fmt} %Y")
+            return (moment + self.delta).strftime(self.fmt)
+        except ValueError:
+            return text
+
+
+class Normalizer:
+    """Applies every rule to a title in one scan: `clean = Normalizer(...)(title)`.
+
+    remove: strings deleted wherever they appear, ignoring case
+    abbreviations: {text: replacement}, case-sensitive
+    time_shift: a TimeShift applied to each match of its pattern
+    collapse_spaces: squeeze runs of whitespace and strip the ends afterwards
+    """
+
+    def __init__(self, remove=(), abbreviations=None, time_shift=None, collapse_spaces=True,
+                 cache_size=CACHE_SIZE):
+        self.abbreviations = dict(abbreviations or {})
+        self.time_shift = time_shift
+        self.collapse_spaces = collapse_spaces
+        self.cache_size = cache_size
+        self._cache = {}
+        parts = []
+        if remove:
+            parts.append(f"(?P<remove>(?i:{trie_pattern(remove)}))")
+        if self.abbreviations:
+            parts.append(f"(?P<abbr>{trie_pattern(self.abbreviations)})")
+        if time_shift is not None:
+            parts.append(f"(?P<time>{time_shift.pattern})")
+        self.regex = re.compile("|".join(parts)) if parts else None
+
+    def _replace(self, match):
+        kind = match.lastgroup
+        if kind == "remove":
+            return ""
+        if kind == "abbr":
+            return self.abbreviations[match.group()]
+        return self.time_shift(match.group())
+
+    def __call__(self, text):
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+        result = self.regex.sub(self._replace, text) if self.regex else text
+        if self.collapse_spaces:
+            result = " ".join(result.split())
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
+
+
+@lru_cache(maxsize=None)
+def time_shifter(hours, pattern=r"\d{2}:\d{2}", fmt="%H:%M"):
+    """Shared Normalizer that only shifts times, keeping the text's spacing."""
+    return Normalizer(time_shift=TimeShift(hours, pattern, fmt), collapse_spaces=False)
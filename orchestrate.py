@@ -0,0 +1,258 @@
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import metrics
+
+# Runs every playlist source from one process and one event loop.
+# Each source is an existing script's entry point, imported lazily so a missing
+# dependency only takes that source down. Async sources run on the loop; blocking
+# ones run in a child process (orchestrate.py --child), so a timeout kills them
+# instead of leaving a thread behind. A Chromium instance and an aiohttp session
+# are created on first use and shared by every async source that asks for them;
+# a blocking source gets its own requests session in its process (they all talk
+# to different upstreams, so one pool would not reuse connections across them).
+# Sources run in parallel as long as their summed cost fits BUDGET.
+
+STATE_PATH = os.path.join(".cache", "orchestrate.json")
+BUDGET = 4       # Concurrency slots shared by all running sources
+GRACE = 5 * 60   # A source is due this many seconds early, so cron jitter never skips a cycle
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+# entry: "module:function"; every: seconds between runs; timeout: seconds;
+# cost: budget slots it holds while running; outputs: paths to commit;
+# resources: {keyword argument: "browser" | "aiohttp" (async sources) | "requests" (blocking)}
+Source = namedtuple("Source", "name entry every timeout cost outputs resources")
+
+SOURCES = [
+    Source("tvapp", "tvapp:main", 45 * MINUTE, 15 * MINUTE, 2,
+           ["tap.m3u8", "tap2.m3u8", "tap3.m3u8"], {"chromium": "browser"}),
+    Source("justintv", "justintv:main", HOUR, 10 * MINUTE, 2, ["justintv.m3u8"], {"chromium": "browser"}),
+    Source("pronba", "pronba:generate_playlist", HOUR, 10 * MINUTE, 1,
+           ["pronba.m3u8", "nba_playlists/"], {}),
+    Source("pxl", "pxl:process_m3u", HOUR, 5 * MINUTE, 1, ["pixelsports.m3u8"], {"session": "requests"}),
+    Source("rk", "rk:save_filtered_m3u8", 45 * MINUTE, 5 * MINUTE, 1, ["rk.m3u8"], {"session": "requests"}),
+    Source("plutotv", "plutotv:process_m3u", 24 * HOUR, 30 * MINUTE, 2, ["plutotv.m3u8"],
+           {"session": "requests"}),
+    # Runs for hours, so supersonic.yml schedules it apart from orchestrate.yml (--exclude supersonic)
+    Source("supersonic", "supersonic:run", 6 * HOUR, 5 * HOUR, 2, ["supersonic.m3u8"],
+           {"session": "aiohttp"}),
+    # Merges whatever the other sources last published; a change lands one cycle later at worst
+    Source("aggregate", "aggregate:build", HOUR, 5 * MINUTE, 1, ["master.m3u8"], {}),
+]
+
+
+class Budget:
+    """Weighted semaphore: a source holds `cost` slots while it runs."""
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.free = slots
+        self.cond = asyncio.Condition()
+
+    async def acquire(self, cost):
+        cost = min(cost, self.slots)
+        async with self.cond:
+            await self.cond.wait_for(lambda: self.free >= cost)
+            self.free -= cost
+        return cost
+
+    async def release(self, cost):
+        async with self.cond:
+            self.free += cost
+            self.cond.notify_all()
+
+
+class Shared:
+    """Lazily created resources shared by every source in one cycle."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self._aiohttp = None
+
+    async def get(self, kind):
+        async with self._lock:
+            if kind == "browser":
+                if self._browser is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch(headless=True)
+                return self._browser
+            if kind == "aiohttp":
+                if self._aiohttp is None:
+                    import aiohttp
+                    connector = aiohttp.TCPConnector(ssl=False, limit=200, ttl_dns_cache=300)
+                    self._aiohttp = aiohttp.ClientSession(connector=connector)
+                return self._aiohttp
+            raise ValueError(f"unknown resource {kind!r}")
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            await self._playwright.stop()
+        if self._aiohttp is not None:
+            await self._aiohttp.close()
+
+
+def requests_session():
+    import requests
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def is_due(source, state, now=None):
+    last = state.get(source.name)
+    return last is None or (now or time.time()) - last >= source.every - GRACE
+
+
+def load_entry(entry):
+    module, _, name = entry.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def run_child(entry, resources):
+    """Runs a blocking source in this process; the exit status tells the parent how it went."""
+    kwargs = {}
+    for arg, kind in resources.items():
+        if kind != "requests":
+            raise ValueError(f"{entry}: {kind!r} cannot be passed to a blocking source")
+        kwargs[arg] = requests_session()
+    load_entry(entry)(**kwargs)
+
+
+async def run_process(source):
+    """Runs a blocking source in a child process and kills it once source.timeout has passed."""
+    env = {**os.environ, "IPTV_METRICS": ",".join(sorted(metrics.FORMATS))}
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), "--child", source.entry,
+        "--resources", json.dumps(source.resources), env=env)
+    try:
+        return await asyncio.wait_for(proc.wait(), source.timeout)
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+
+async def run_source(source, shared, budget):
+    """Runs one source inside its budget and timeout; returns (ok, seconds, error)."""
+    cost = await budget.acquire(source.cost)
+    start = time.perf_counter()
+    try:
+        func = load_entry(source.entry)
+        if inspect.iscoroutinefunction(func):
+            kwargs = {arg: await shared.get(kind) for arg, kind in source.resources.items()}
+            print(f"▶️ {source.name} started")
+            await asyncio.wait_for(func(**kwargs), source.timeout)
+        else:
+            print(f"▶️ {source.name} started")
+            status = await run_process(source)
+            if status:
+                return False, time.perf_counter() - start, f"exited with status {status}"
+        return True, time.perf_counter() - start, None
+    except asyncio.TimeoutError:
+        return False, time.perf_counter() - start, f"timed out after {source.timeout}s"
+    except Exception as e:
+        return False, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+    finally:
+        await budget.release(cost)
+
+
+async def run(sources, budget=BUDGET, state_path=STATE_PATH):
+    """Runs the given sources concurrently and records the successful ones in the state file."""
+    state = load_state(state_path)
+    shared = Shared()
+    slots = Budget(budget)
+    try:
+        results = await asyncio.gather(*(run_source(source, shared, slots) for source in sources))
+    finally:
+        await shared.close()
+
+    now = time.time()
+    print("\n--- CYCLE SUMMARY ---")
+    for source, (ok, seconds, error) in zip(sources, results):
+        if ok:
+            state[source.name] = now
+            print(f"✅ {source.name:<11} {seconds:7.1f}s")
+        else:
+            print(f"❌ {source.name:<11} {seconds:7.1f}s  {error}")
+    save_state(state, state_path)
+    return all(ok for ok, _, _ in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run due playlist sources in one process.")
+    parser.add_argument("names", nargs="*", help="sources to run (default: every due source)")
+    parser.add_argument("--force", action="store_true", help="ignore schedules")
+    parser.add_argument("--exclude", action="append", default=[], metavar="NAME",
+                        help="leave a source out (e.g. one that has its own workflow); repeatable")
+    parser.add_argument("--outputs", action="store_true", help="print the selected sources' output paths and exit")
+    parser.add_argument("--budget", type=int, default=BUDGET)
+    parser.add_argument("--state", default=STATE_PATH, help="file recording each source's last successful run")
+    parser.add_argument("--metrics", help="write per-source run reports: json, prom or json,prom")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--resources", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, json.loads(args.resources))
+        return
+
+    if args.metrics:
+        metrics.configure(args.metrics.split(","))
+
+    by_name = {source.name: source for source in SOURCES}
+    unknown = [name for name in args.names + args.exclude if name not in by_name]
+    if unknown:
+        parser.error(f"unknown source(s): {', '.join(unknown)}")
+    selected = [by_name[name] for name in args.names] if args.names else SOURCES
+    selected = [source for source in selected if source.name not in args.exclude]
+
+    if args.outputs:
+        print(" ".join(path for source in selected for path in source.outputs if os.path.exists(path)))
+        return
+
+    if not (args.force or args.names):
+        state = load_state(args.state)
+        selected = [source for source in selected if is_due(source, state)]
+    if not selected:
+        print("Nothing is due.")
+        return
+
+    print(f"Running: {', '.join(source.name for source in selected)}")
+    # A failed source fails the workflow run, so it shows up in Actions
+    sys.exit(0 if asyncio.run(run(selected, args.budget, args.state)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import tempfile
+from collections import namedtuple
+
+import m3u
+import metrics
+
+# Incremental output for generated files.
+# Files are written to a temp file in the target directory and renamed into
+# place, so readers never see a half-written file, and only when their content
+# actually changed. Playlists are hashed while they stream out; with
+# unordered=True the hash ignores entry order, so a reshuffle is not a change.
+
+SyncReport = namedtuple("SyncReport", "added updated removed unchanged")
+WriteResult = namedtuple("WriteResult", "count changed")
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _temp_for(path):
+    folder = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=os.path.basename(path))
+    os.chmod(tmp, 0o644)  # mkstemp creates 0600; the rename keeps the mode
+    return fd, tmp
+
+
+def write_atomic(path, data):
+    """Replaces path with data via a temp file in the same directory."""
+    fd, tmp = _temp_for(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        _remove(tmp)
+        raise
+
+
+def sync_dir(folder, files):
+    """Makes folder hold exactly `files` ({filename: bytes or str}) and returns a SyncReport."""
+    os.makedirs(folder, exist_ok=True)
+    with metrics.stage("write"):
+        report = _sync_dir(folder, files)
+    metrics.add("files_written", report.added + report.updated)
+    return report
+
+
+def _sync_dir(folder, files):
+    added = updated = unchanged = removed = 0
+    for name, data in files.items():
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        path = os.path.join(folder, name)
+        current = _read(path)
+        if current == data:
+            unchanged += 1
+            continue
+        write_atomic(path, data)
+        if current is None:
+            added += 1
+        else:
+            updated += 1
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if name not in files and os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+    return SyncReport(added, updated, removed, unchanged)
+
+
+def format_report(report):
+    return (f"📝 {report.added} added, {report.updated} updated, "
+            f"{report.removed} removed, {report.unchanged} unchanged")
+
+
+class _UnorderedDigest:
+    """Order-independent digest: the header hash plus the sum of every entry's hash."""
+
+    MASK = (1 << 256) - 1
+
+    def __init__(self, header):
+        self.header = hashlib.sha256(header).digest()
+        self.total = 0
+
+    def update(self, entry_bytes):
+        self.total = (self.total + int.from_bytes(hashlib.sha256(entry_bytes).digest(), "big")) & self.MASK
+
+    def digest(self):
+        return self.header + self.total.to_bytes(32, "big")
+
+
+def _file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: f.read(m3u.CHUNK_SIZE), b""):
+                digest.update(chunk)
+            return digest.digest()
+    except FileNotFoundError:
+        return None
+
+
+def _unordered_file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            digest = _UnorderedDigest(f.readline().rstrip(b"\r\n"))
+            for entry in m3u.parse(f):
+                digest.update(entry.to_bytes())
+            return digest.digest()
+    except FileNotFoundError:
+        return None
+
+
+def write_playlist(entries, path, header=m3u.HEADER, unordered=False):
+    """Streams entries to a temp file and renames it over path only if the content changed.
+
+    With unordered=True the playlists are compared as sets of entries, so the
+    old file is kept when only the order differs. Returns a WriteResult.
+    """
+    with metrics.stage("write"):
+        result = _write_playlist(entries, path, header, unordered)
+    metrics.add("entries_written", result.count)
+    return result
+
+
+def _write_playlist(entries, path, header, unordered):
+    header_bytes = header.encode("utf-8")
+    digest = _UnorderedDigest(header_bytes) if unordered else hashlib.sha256(header_bytes + b"\n")
+    count = 0
+    fd, tmp = _temp_for(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header_bytes + b"\n")
+            for entry in entries:
+                data = entry.to_bytes()
+                f.write(data)
+                digest.update(data)
+                count += 1
+        old = _unordered_file_digest(path) if unordered else _file_digest(path)
+        if old == digest.digest():
+            _remove(tmp)
+            return WriteResult(count, False)
+        os.replace(tmp, path)
+    except BaseException:
+        _remove(tmp)
+        raise
+    return WriteResult(count, True)
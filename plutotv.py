@@ -1,103 +1,120 @@
+import asyncio
+
 import requests
-import re
-from concurrent.futures import ThreadPoolExecutor
+
+import delta
+import fetch
+import linkcheck
+import m3ufilter
+import metrics
+import output
+import probecache
 
 # Source URL
 M3U_URL = "https://raw.githubusercontent.com/abusaeeidx/IPTV-Scraper-Zilla/refs/heads/main/PlutoTV-All.m3u"
 OUTPUT_FILE = "plutotv.m3u8"
-MAX_WORKERS = 25  # Increased slightly for speed
+MAX_WORKERS = 25  # Concurrent probes per host
+MAX_IN_FLIGHT = 100
+DELTA_SLICES = 7  # Runs are daily: unchanged streams are re-probed 1/7 per run, all within a week
+PROBE_MAX_AGE = 14 * 24 * 3600  # Two rotations: an older stored probe is a stream no longer listed
+SOURCE_FILTER = m3ufilter.Filter()  # http(s) streams only
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) VLC/3.0.18",
     "Accept": "*/*"
 }
 
-def check_link(item):
-    """Checks if a URL is active and returns the metadata + URL."""
-    title, info, url = item
-    try:
-        # stream=True is essential to stop after the header check
-        response = requests.get(url, headers=HEADERS, timeout=5, stream=True, verify=False)
-        is_ok = response.status_code == 200
-        response.close()
-        if is_ok:
-            return {"title": title, "info": info, "url": url}
-    except:
-        pass
-    return None
-
-def extract_title(info_line):
-    """Extracts the display name of the channel from the #EXTINF line."""
-    # Looks for the text after the last comma
-    match = re.search(r',(.*)$', info_line)
-    if match:
-        return match.group(1).strip()
-    return info_line
-
-def process_m3u():
-    requests.packages.urllib3.disable_warnings()
-    
+def retag(entry):
+    # Update group-title to Pluto TV
+    entry.set_attr("group-title", "Pluto TV")
+    return entry
+
+def normalize_title(title):
+    return " ".join(title.casefold().split())
+
+def group_candidates(entries):
+    """Groups entries by normalized title, keeping source order and dropping repeated URLs."""
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(normalize_title(entry.title), [])
+        if all(entry.url != other.url for other in group):
+            group.append(entry)
+    return list(groups.values())
+
+async def pick_live(groups, cache, plan=None):
+    """Returns the first live entry of each group, probing one candidate at a time."""
+    probes = {}
+    async with linkcheck.Checker(
+        strategy=linkcheck.RANGE,
+        timeout=5,
+        per_host=MAX_WORKERS,
+        max_in_flight=MAX_IN_FLIGHT,
+        headers=HEADERS,
+        cache=cache,
+        delta=plan,
+    ) as checker:
+        async def probe(url):
+            # The same URL under two different titles is only probed once
+            task = probes.get(url)
+            if task is None:
+                task = probes[url] = asyncio.ensure_future(checker.check(url))
+            return await task
+
+        async def first_live(group):
+            for entry in group:
+                if (await probe(entry.url)).ok:
+                    return entry
+            return None
+
+        winners = await asyncio.gather(*(first_live(group) for group in groups))
+    return winners, len(probes)
+
+@metrics.instrument("plutotv", OUTPUT_FILE)
+def process_m3u(session=requests):
     print("Fetching source M3U...")
-    try:
-        response = requests.get(M3U_URL, headers=HEADERS)
-        response.raise_for_status()
-    except Exception as e:
-        print(f"Error: {e}")
-        return
-
-    lines = response.text.splitlines()
+    fetched = fetch.fetch(M3U_URL, "plutotv", session, headers=HEADERS)
+    # An unchanged source is not skipped: the delta plan then only re-probes this run's slice
+    if not fetched.changed:
+        print("Source unchanged, re-validating one slice of it")
+
     tasks = []
-    current_info = None
 
     # Step 1: Parse and Prepare Tasks
-    for line in lines:
-        line = line.strip()
-        if not line: continue
-        
-        if line.startswith("#EXTINF"):
-            # Update group-title to Pluto TV
-            if 'group-title="' in line:
-                updated_line = re.sub(r'group-title="[^"]*"', 'group-title="Pluto TV"', line)
-            else:
-                updated_line = line.replace('#EXTINF:-1', '#EXTINF:-1 group-title="Pluto TV"')
-            current_info = updated_line
-            
-        elif line.startswith("http") and current_info:
-            title = extract_title(current_info)
-            tasks.append((title, current_info, line))
-            current_info = None
-
-    print(f"Checking {len(tasks)} streams (Removing duplicates)...")
+    with metrics.stage("parse"):
+        for entry in SOURCE_FILTER.parse(fetched.path):
+            tasks.append(retag(entry))
+
+    # Step 2: Deduplication before any network work
+    groups = group_candidates(tasks)
+    print(f"Checking {len(groups)} unique titles from {len(tasks)} streams...")
     
-    final_channels = {} # Dictionary to store: { 'Channel Name': (info, url) }
-
-    # Step 2: Multi-threaded verification
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # We use as_completed to process results as soon as they are ready (faster)
-        from concurrent.futures import as_completed
-        future_to_url = {executor.submit(check_link, t): t for t in tasks}
-        
-        for future in as_completed(future_to_url):
-            result = future.result()
-            if result:
-                title = result['title']
-                # Step 3: Deduplication logic
-                # Only add if the title isn't already in our 'working' dictionary
-                if title not in final_channels:
-                    final_channels[title] = (result['info'], result['url'])
-                    print(f"[UNIQUE] Added: {title}")
+    final_channels = {} # Dictionary to store: { 'Channel Name': entry }
+
+    # Step 3: Concurrent verification over pooled keep-alive connections
+    # New or changed URLs are probed now; known ones reuse their stored result
+    # unless they fall in this run's re-validation slice
+    with probecache.ProbeCache() as cache:
+        plan = delta.Delta("plutotv", cache, slices=DELTA_SLICES)
+        with metrics.stage("probe"):
+            winners, probed = asyncio.run(pick_live(groups, cache, plan))
+        print(f"Checked {probed} URLs")
+        print(plan.report())
+        cache.prune(PROBE_MAX_AGE, linkcheck.RANGE)
+
+    for entry in winners:
+        if entry:
+            final_channels[entry.title] = entry
+            print(f"[UNIQUE] Added: {entry.title}")
 
     # Step 4: Write Output
-    new_m3u = ["#EXTM3U"]
-    for title in sorted(final_channels.keys()):
-        info, url = final_channels[title]
-        new_m3u.append(info)
-        new_m3u.append(url)
-
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        f.write("\n".join(new_m3u))
+    result = output.write_playlist((final_channels[title] for title in sorted(final_channels)), OUTPUT_FILE)
+    fetched.commit()
+    plan.finish()
     
-    print(f"\nSuccess! Cleaned playlist saved to {OUTPUT_FILE}")
+    if result.changed:
+        print(f"\nSuccess! Cleaned playlist saved to {OUTPUT_FILE}")
+    else:
+        print(f"\nNo changes, {OUTPUT_FILE} left as it was")
     print(f"Total unique channels found: {len(final_channels)}")
 
 if __name__ == "__main__":
@@ -0,0 +1,333 @@
+import codecs
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from curl_cffi import requests
+
+import metrics
+
+# Shared Stalker (MAG portal.php) and Xtream (player_api.php) clients.
+# Handshake tokens, genre lists and channel listings are cached on disk with a
+# TTL each, so a scheduled run that finds fresh entries skips the portal. Stalker
+# listings are paged: the first page tells us the page count, the rest are
+# fetched in parallel. Xtream stream lists are parsed as they arrive.
+
+CACHE_DIR = os.path.join(".cache", "portal")
+TOKEN_TTL = 3600
+GENRES_TTL = 24 * 3600
+LISTING_TTL = 15 * 60
+CHUNK_SIZE = 1 << 16
+MAX_PAGE_WORKERS = 8
+
+STALKER_USER_AGENT = "Mozilla/5.0 (QtEmbedded; U; Linux; C) AppleWebKit/533.3 (KHTML, like Gecko) MAG200 stbapp ver: 2 rev: 250 Safari/533.3"
+
+
+class PortalCache:
+    """JSON files under `path`, one per key, each trusted for a caller-given TTL."""
+
+    def __init__(self, path=CACHE_DIR):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, key, suffix=".json"):
+        return os.path.join(self.path, hashlib.sha1(key.encode()).hexdigest() + suffix)
+
+    def _fresh(self, path, ttl, now=None):
+        try:
+            fresh = (now or time.time()) - os.path.getmtime(path) <= ttl
+        except OSError:
+            fresh = False
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return fresh
+
+    def get(self, key, ttl):
+        path = self._file(key)
+        if not self._fresh(path, ttl):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, value):
+        path = self._file(key)
+        tmp = f"{path}.{os.getpid()}.{id(value)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def lines_path(self, key, ttl):
+        """Path of a fresh JSON-lines listing for key, or None."""
+        path = self._file(key, ".jsonl")
+        return path if self._fresh(path, ttl) else None
+
+    def lines_writer(self, key):
+        return _LinesWriter(self._file(key, ".jsonl"))
+
+    def report(self):
+        return f"🗃️ Portal cache: {self.hits} hits, {self.misses} misses"
+
+
+class _LinesWriter:
+    """Writes one JSON value per line to a temp file; only a complete listing is kept."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp = f"{path}.{os.getpid()}.tmp"
+        self.f = open(self.tmp, "w", encoding="utf-8")
+
+    def write(self, value):
+        self.f.write(json.dumps(value, ensure_ascii=False))
+        self.f.write("\n")
+
+    def commit(self):
+        self.f.close()
+        os.replace(self.tmp, self.path)
+
+    def discard(self):
+        self.f.close()
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+
+# --- Stalker ---
+
+class StalkerClient:
+    """Blocking Stalker portal client on a curl_cffi session.
+
+    Pages of one listing are fetched on a small thread pool; the session is
+    shared between threads the same way the old per-genre pool shared it.
+    """
+
+    def __init__(self, base, mac, headers=None, cache=None, workers=MAX_PAGE_WORKERS,
+                 impersonate="chrome110", timeout=120, page_size=500):
+        self.base = base.rstrip("/")
+        self.url = f"{self.base}/portal.php"
+        self.mac = mac
+        self.cache = cache
+        self.workers = workers
+        self.impersonate = impersonate
+        self.timeout = timeout
+        self.page_size = page_size
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": STALKER_USER_AGENT,
+            "X-User-Agent": "Model: MAG250; Link: Ethernet",
+            "Referer": f"{self.base}/c/",
+            "Accept": "*/*",
+            "Cookie": f"mac={mac}; stb_lang=en; timezone=Europe/Berlin",
+            **(headers or {}),
+        })
+
+    def _key(self, *parts):
+        return "|".join(("stalker", self.base, self.mac) + tuple(str(p) for p in parts))
+
+    def call(self, action, params=None, type="itv"):
+        """Runs one portal action and returns its "js" payload, or None on any failure."""
+        query = {"type": type, "action": action, "JsHttpRequest": "1-xml"}
+        if params: query.update(params)
+        try:
+            res = self.session.get(self.url, params=query, impersonate=self.impersonate, timeout=self.timeout)
+            metrics.add("bytes_fetched", len(res.content))
+            data = res.json()
+            return data.get("js") if isinstance(data, dict) else data
+        except Exception: return None
+
+    def _authorize(self, token):
+        self.session.headers.update({"Authorization": f"Bearer {token}"})
+
+    def connect(self):
+        """Reuses a cached token if the portal still accepts it, else does a fresh handshake."""
+        key = self._key("token")
+        token = self.cache.get(key, TOKEN_TTL) if self.cache else None
+        if token:
+            self._authorize(token)
+            if self.call("get_profile"):
+                return True
+            self.cache.delete(key)
+        handshake = self.call("handshake")
+        if not (isinstance(handshake, dict) and handshake.get("token")):
+            return False
+        token = handshake["token"]
+        self._authorize(token)
+        self.call("get_profile")
+        if self.cache:
+            self.cache.put(key, token)
+        return True
+
+    def genres(self, titles=None):
+        """Returns the genre list, narrowed to `titles` (stripped names) when given."""
+        key = self._key("genres")
+        genres = self.cache.get(key, GENRES_TTL) if self.cache else None
+        if genres is None:
+            genres = self.call("get_genres")
+            if not isinstance(genres, list):
+                return []
+            if self.cache:
+                self.cache.put(key, genres)
+        if titles is None:
+            return genres
+        wanted = {t.strip() for t in titles}
+        return [g for g in genres if g.get("title", "").strip() in wanted]
+
+    def _page(self, genre_id, page):
+        """One page of a listing, or None if the portal call failed."""
+        data = self.call("get_ordered_list", {"genre": genre_id, "max": self.page_size, "p": page})
+        return data if isinstance(data, dict) else None
+
+    def channels(self, genre_id, pool=None):
+        """Returns every channel of one genre, fetching pages 2..n in parallel.
+
+        Returns None, and caches nothing, if any page failed: a partial listing
+        would otherwise look like channels that went away.
+        """
+        key = self._key("channels", genre_id)
+        cached = self.cache.get(key, LISTING_TTL) if self.cache else None
+        if cached is not None:
+            return cached
+        first = self._page(genre_id, 1)
+        if first is None:
+            return None
+        channels = list(first.get("data") or [])
+        try:
+            total = int(first.get("total_items") or 0)
+            per_page = int(first.get("max_page_items") or 0)
+        except (TypeError, ValueError):
+            total = per_page = 0
+        pages = -(-total // per_page) if per_page and len(channels) < total else 1
+        if pages > 1:
+            own_pool = pool is None
+            pool = pool or ThreadPoolExecutor(max_workers=min(self.workers, pages - 1))
+            try:
+                for data in pool.map(lambda p: self._page(genre_id, p), range(2, pages + 1)):
+                    if data is None:
+                        return None
+                    channels.extend(data.get("data") or [])
+            finally:
+                if own_pool:
+                    pool.shutdown()
+        if self.cache and channels:
+            self.cache.put(key, channels)
+        return channels
+
+    def channels_for(self, titles):
+        """Returns {genre title: channels, or None if incomplete} for the requested genres only."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return {g.get("title", "").strip(): self.channels(g.get("id"), pool)
+                    for g in self.genres(titles)}
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Xtream ---
+
+async def iter_json_array(chunks):
+    """Yields the items of a top-level JSON array from an async iterable of byte chunks.
+
+    Only the current, not yet complete item is buffered. Raises ValueError when
+    the stream ends before the closing bracket or with text that does not
+    decode, so a cut-off listing is never mistaken for a complete one.
+    """
+    decoder = json.JSONDecoder()
+    # Chunks may split a multi-byte character, so decode incrementally
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    text = ""
+    started = False
+    async for chunk in chunks:
+        text += utf8.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(text) and text[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(text):
+                break
+            if not started:
+                if text[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if text[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                break  # incomplete so far; an item that never completes fails at the end
+            if end == len(text) and not isinstance(item, (dict, list)):
+                break  # a bare number may continue in the next chunk
+            yield item
+            pos = end
+        text = text[pos:]
+    text += utf8.decode(b"", final=True)
+    if not started:
+        raise ValueError("expected a JSON array")
+    if text.strip(" \t\r\n,"):
+        raise ValueError(f"undecodable JSON array item: {text[:80]!r}")
+    raise ValueError("JSON array ended before its closing bracket")
+
+
+class XtreamClient:
+    """Async Xtream Codes client sharing the caller's aiohttp session."""
+
+    def __init__(self, base, username, password, session, cache=None, listing_ttl=LISTING_TTL):
+        self.base = base.rstrip("/")
+        self.username = username
+        self.password = password
+        self.session = session
+        self.cache = cache
+        self.listing_ttl = listing_ttl
+
+    def stream_url(self, stream_id, extension="ts"):
+        return f"{self.base}/live/{self.username}/{self.password}/{stream_id}.{extension}"
+
+    async def live_streams(self, category_id=None):
+        """Yields get_live_streams items one by one, from the cache when it is fresh."""
+        params = {"username": self.username, "password": self.password, "action": "get_live_streams"}
+        if category_id is not None:
+            params["category_id"] = category_id
+        key = "|".join(("xtream", self.base, self.username, str(category_id)))
+        path = self.cache.lines_path(key, self.listing_ttl) if self.cache else None
+        if path:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+            return
+
+        writer = self.cache.lines_writer(key) if self.cache else None
+        try:
+            async with self.session.get(f"{self.base}/player_api.php", params=params) as response:
+                response.raise_for_status()
+                async for item in iter_json_array(metrics.acounted(response.content.iter_chunked(CHUNK_SIZE))):
+                    if writer:
+                        writer.write(item)
+                    yield item
+        except BaseException:
+            if writer:
+                writer.discard()
+            raise
+        if writer:
+            writer.commit()
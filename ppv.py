@@ -1,9 +1,14 @@
 import asyncio
 from playwright.async_api import async_playwright
 
+import m3u
+import metrics
+import output
+
 TARGET_URL = "https://www.cineby.gd/movie/1426964"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
 
+@metrics.instrument("ppv", "stream.m3u")
 async def scrape_cineby_fixed(url):
     async with async_playwright() as p:
         # Added --disable-gpu to fix the white screen issue in CI/Xvfb
@@ -54,8 +59,7 @@ async def scrape_cineby_fixed(url):
             await page.screenshot(path="debug.png")
 
             if captured_link:
-                with open("stream.m3u", "w") as f:
-                    f.write(f"#EXTM3U\n#EXTVLCOPT:http-referrer={url}\n{captured_link}")
+                output.write_playlist([m3u.Entry("Stream", captured_link, options=[f"#EXTVLCOPT:http-referrer={url}"])], "stream.m3u")
                 print("✅ stream.m3u created.")
         
         finally:
@@ -0,0 +1,139 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+# On-disk cache of liveness probe results, keyed by normalized URL and strategy.
+# Fresh entries let a scheduled run skip the network entirely; live results are
+# trusted for POSITIVE_TTL seconds, dead ones are retried sooner.
+# Several sources share the file from concurrent processes, so every write is
+# its own short transaction and a writer waits up to BUSY_TIMEOUT for the lock.
+
+CACHE_PATH = os.path.join(".cache", "probes.sqlite")
+POSITIVE_TTL = 6 * 3600
+NEGATIVE_TTL = 30 * 60
+BUSY_TIMEOUT = 30
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    """Lowercases scheme and host, drops default ports and fragments; keeps credentials.
+
+    A URL that does not parse (e.g. a non-numeric port) is returned stripped, so
+    it is still cached and probed on its own instead of failing the caller.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    userinfo, at, _ = parts.netloc.rpartition("@")
+    if at:
+        # Different credentials on the same host are different streams
+        host = f"{userinfo}@{host}"
+    return urlunsplit((scheme, host, parts.path or "/", parts.query, ""))
+
+
+class ProbeCache:
+    def __init__(self, path=CACHE_PATH, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # Checker queries from a worker thread, so calls are serialized here
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS probes (
+                url TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                ok INTEGER NOT NULL,
+                status INTEGER,
+                latency REAL,
+                mbps REAL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (url, strategy)
+            )"""
+        )
+
+    def _row(self, url, strategy):
+        with self._lock:
+            return self.db.execute(
+                "SELECT ok, status, latency, mbps, checked_at FROM probes WHERE url = ? AND strategy = ?",
+                (normalize_url(url), strategy),
+            ).fetchone()
+
+    def get(self, url, strategy, now=None):
+        """Returns (ok, status, latency, mbps, checked_at) if still fresh, else None."""
+        row = self._row(url, strategy)
+        if row is None:
+            self.misses += 1
+            return None
+        ttl = self.positive_ttl if row[0] else self.negative_ttl
+        if (now or time.time()) - row[4] > ttl:
+            self.misses += 1
+            self.stale += 1
+            return None
+        self.hits += 1
+        return bool(row[0]), row[1], row[2], row[3], row[4]
+
+    def last(self, url, strategy):
+        """Returns the stored (ok, status, latency, mbps, checked_at) however old, or None."""
+        row = self._row(url, strategy)
+        if row is None:
+            return None
+        return bool(row[0]), row[1], row[2], row[3], row[4]
+
+    def put(self, url, strategy, ok, status=None, latency=None, mbps=None, checked_at=None):
+        # Committed right away: an open write transaction would lock out the other sources
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), strategy, int(ok), status, latency, mbps, checked_at or time.time()),
+            )
+
+    def prune(self, max_age=None, strategy=None):
+        """Drops rows older than max_age (defaults to the longer TTL), only `strategy`'s if given."""
+        max_age = max_age or max(self.positive_ttl, self.negative_ttl)
+        query, args = "DELETE FROM probes WHERE checked_at < ?", (time.time() - max_age,)
+        if strategy is not None:
+            query, args = f"{query} AND strategy = ?", (*args, strategy)
+        with self._lock, self.db:
+            return self.db.execute(query, args).rowcount
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale,
+                "hit_rate": round(self.hit_rate, 3)}
+
+    def report(self):
+        return (f"🗃️ Probe cache: {self.hits} hits, {self.misses} misses "
+                f"({self.stale} stale), hit rate {self.hit_rate:.0%}")
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,14 +1,13 @@
-import os
-import json
-import time
 import re
-from datetime import datetime, timedelta
-from curl_cffi import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import m3u
+import metrics
+import normalize
+import output
+import portal
 
 # --- CONFIGURATION ---
 BASE_DOMAIN = "http://pro.reott8k.xyz:80"
-PORTAL_URL = f"{BASE_DOMAIN}/portal.php"
 MAC_ADDRESS = "00:1A:79:7B:BB:36" 
 SAVE_FOLDER = "nba_playlists"
 MASTER_FILENAME = "pronba.m3u8"
@@ -30,41 +29,26 @@ HEADERS = {
     "Cookie": f"mac={MAC_ADDRESS}; stb_lang=en; timezone=Europe/Berlin",
 }
 
+# "Sat 01 Mar 19:30" shifted by HOURS_OFFSET in the current year (may roll the date)
+EVENT_TIME = normalize.time_shifter(
+    HOURS_OFFSET,
+    r"^(?i:mon|tue|wed|thu|fri|sat|sun)\w* \d{1,2} (?i:[a-z]{3,9}) \d{1,2}:\d{2}$",
+    "%a %d %b %H:%M",
+)
+TEAMS = normalize.Normalizer(remove=["-"])
+
 def adjust_time_string(time_str):
-    current_year = datetime.now().year
-    try:
-        dt = datetime.strptime(f"{time_str} {current_year}", "%a %d %b %H:%M %Y")
-        dt_new = dt + timedelta(hours=HOURS_OFFSET)
-        return dt_new.strftime("%a %d %b %H:%M")
-    except Exception:
-        return time_str
+    return EVENT_TIME(time_str)
 
 def clean_channel_name(name):
     parts = name.split('|')
     if len(parts) >= 2:
-        teams_raw = parts[0].strip()
-        time_raw = parts[1].strip()
-        new_time = adjust_time_string(time_raw)
-        teams_clean = teams_raw.replace("-", "").replace("  ", " ").strip()
-        return f"{new_time} | {teams_clean}"
+        new_time = adjust_time_string(parts[1].strip())
+        return f"{new_time} | {TEAMS(parts[0])}"
     return name.strip()
 
-def get_stalker_data(session, action, extra_params=None):
-    params = {"type": "itv", "action": action, "JsHttpRequest": "1-xml"}
-    if extra_params: params.update(extra_params)
-    try:
-        res = session.get(PORTAL_URL, params=params, headers=session.headers, impersonate="chrome110", timeout=120)
-        data = res.json()
-        return data.get("js") if isinstance(data, dict) else data
-    except Exception: return None
-
-def fetch_category(session, cat):
-    cat_id = cat.get('id')
-    cat_name = cat.get('title', 'General').strip()
-    if cat_name != TARGET_CATEGORY: return []
-    chunk_data = get_stalker_data(session, "get_ordered_list", {"genre": cat_id, "max": 500})
+def event_channels(ch_list):
     channels = []
-    ch_list = chunk_data.get('data', []) if isinstance(chunk_data, dict) else []
     for ch in ch_list:
         raw_name = ch.get("name", "")
         if "- NO EVENT STREAMING -" in raw_name or "##### NBA PASS PPV ⁸ᴷ #####" in raw_name: continue
@@ -72,34 +56,31 @@ def fetch_category(session, cat):
         channels.append({"name": final_name, "id": ch.get("id")})
     return channels
 
+@metrics.instrument("pronba", MASTER_FILENAME)
 def generate_playlist():
-    if not os.path.exists(SAVE_FOLDER):
-        os.makedirs(SAVE_FOLDER)
-    else:
-        for file in os.listdir(SAVE_FOLDER):
-            os.remove(os.path.join(SAVE_FOLDER, file))
-
-    session = requests.Session(); session.headers.update(HEADERS)
     print(f"[*] Connecting to {BASE_DOMAIN}...")
-    handshake = get_stalker_data(session, "handshake")
-    if isinstance(handshake, dict) and handshake.get("token"):
-        session.headers.update({"Authorization": f"Bearer {handshake.get('token')}"})
-    get_stalker_data(session, "get_profile")
-    categories = get_stalker_data(session, "get_genres")
-    
-    if not categories: return print("❌ Failed to get categories.")
+    # Only the target genre is listed; its pages are fetched in parallel
+    with portal.StalkerClient(BASE_DOMAIN, MAC_ADDRESS, HEADERS, cache=portal.PortalCache(),
+                              workers=MAX_WORKERS) as client, metrics.stage("source_fetch"):
+        if not client.connect(): return print("❌ Handshake failed.")
+        listings = client.channels_for([TARGET_CATEGORY])
+        print(client.cache.report())
+
+    if not listings: return print("❌ Failed to get categories.")
+    # A partial listing would make sync_dir delete the files of every missing channel
+    incomplete = [title for title, ch_list in listings.items() if ch_list is None]
+    if incomplete: return print(f"❌ Incomplete listing for {', '.join(incomplete)}, keeping the current files.")
 
     all_channels = []
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = [executor.submit(fetch_category, session, cat) for cat in categories]
-        for future in as_completed(futures):
-            all_channels.extend(future.result())
+    for ch_list in listings.values():
+        all_channels.extend(event_channels(ch_list))
 
     if not all_channels: return print("⚠️ No channels found.")
     all_channels.sort(key=lambda x: x['name'])
 
-    # Write individual files AND build the Master Playlist content
-    master_lines = ["#EXTM3U\n"]
+    # Build the individual files AND the Master Playlist content
+    channel_files = {}
+    master_entries = []
     
     for ch in all_channels:
         stream_url = f"{BASE_DOMAIN}/play/live.php?mac={MAC_ADDRESS}&stream={ch['id']}&extension=m3u8"
@@ -108,21 +89,21 @@ def generate_playlist():
         safe_filename = re.sub(r'[\\/*?:"<>|]', "", ch['name']) + ".m3u8"
         github_safe_name = safe_filename.replace(" ", "%20")
         
-        # 2. Save individual M3U
-        file_path = os.path.join(SAVE_FOLDER, safe_filename)
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(f"#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-STREAM-INF:PROGRAM-ID=1,BANDWIDTH=2500000\n{stream_url}\n")
+        # 2. Individual M3U, written below only if new or changed
+        channel_files[safe_filename] = f"#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-STREAM-INF:PROGRAM-ID=1,BANDWIDTH=2500000\n{stream_url}\n"
 
         # 3. Add entry to Master Playlist pointing to GitHub
         github_url = f"{GITHUB_RAW_BASE}{github_safe_name}"
-        master_lines.append(f'#EXTINF:-1 group-title="{OUTPUT_GROUP_NAME}",{ch["name"]}\n{github_url}\n')
+        master_entries.append(m3u.Entry(ch["name"], github_url, {"group-title": OUTPUT_GROUP_NAME}))
+
+    # 4. Sync the folder: stale files are removed, unchanged ones are left alone
+    report = output.sync_dir(SAVE_FOLDER, channel_files)
 
-    # 4. Save Master M3U8
-    with open(MASTER_FILENAME, "w", encoding="utf-8") as f:
-        f.writelines(master_lines)
+    # 5. Save Master M3U8
+    output.write_playlist(master_entries, MASTER_FILENAME)
 
     print(f"\n✅ SUCCESS!")
-    print(f"📂 Individual files in: '{SAVE_FOLDER}'")
+    print(f"📂 Individual files in: '{SAVE_FOLDER}' ({output.format_report(report)})")
     print(f"🔗 Master file created: '{MASTER_FILENAME}' pointing to GitHub Raw.")
 
 if __name__ == "__main__":
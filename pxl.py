@@ -1,5 +1,10 @@
 import requests
-import re
+
+import fetch
+import m3ufilter
+import metrics
+import normalize
+import output
 
 TEAM_MAP = {
     "Atlanta Hawks": "ATL", "Boston Celtics": "BOS", "Brooklyn Nets": "BKN",
@@ -14,73 +19,46 @@ TEAM_MAP = {
     "Toronto Raptors": "TOR", "Utah Jazz": "UTA", "Washington Wizards": "WAS"
 }
 
-def clean_title(line):
-    # 1. Force group-title to "pixelsports"
-    line = re.sub(r'group-title="[^"]*"', 'group-title="pixelsports"', line)
-    
-    # 2. Split the line to isolate the display name (everything after the last comma)
-    if "," in line:
-        params, title = line.rsplit(",", 1)
-        
-        # Remove [NBA] and (PIXEL) - case insensitive
-        title = re.sub(r'\[NBA\]', '', title, flags=re.IGNORECASE)
-        title = re.sub(r'\(PIXEL\)', '', title, flags=re.IGNORECASE)
-        
-        # Replace full team names with abbreviations from TEAM_MAP
-        for full_name, short_name in TEAM_MAP.items():
-            if full_name in title:
-                title = title.replace(full_name, short_name)
-        
-        # Clean up extra whitespace left behind
-        title = ' '.join(title.split())
-        line = f"{params},{title}"
-        
-    return line
+# Remove [NBA] and (PIXEL) (case insensitive), abbreviate teams from TEAM_MAP
+# and clean up the whitespace left behind, all in one pass per title
+TITLE_RULES = normalize.Normalizer(remove=["[NBA]", "(PIXEL)"], abbreviations=TEAM_MAP)
 
-def process_m3u():
-    url = "https://raw.githubusercontent.com/doms9/iptv/refs/heads/default/M3U8/events.m3u8"
-    old_domain = "https://hd.bestlive.top:443"
-    new_domain = "https://hd.pixelhd.online:443"
-    
-    try:
-        print(f"Fetching and processing NBA/PIXEL events...")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        lines = response.text.splitlines()
+# PIXEL anywhere on the #EXTINF line (case insensitive), http(s) streams only
+PIXEL_FILTER = m3ufilter.Filter(include=["PIXEL"], match=m3ufilter.EXTINF)
+
+SOURCE_URL = "https://raw.githubusercontent.com/doms9/iptv/refs/heads/default/M3U8/events.m3u8"
+OUTPUT_FILE = "pixelsports.m3u8"
+OLD_DOMAIN = "https://hd.bestlive.top:443"
+NEW_DOMAIN = "https://hd.pixelhd.online:443"
 
-        output = ["#EXTM3U"]
-        
-        for i in range(len(lines)):
-            # Filter for PIXEL entries
-            if lines[i].startswith("#EXTINF") and "PIXEL" in lines[i].upper():
-                # Process the title and group
-                modified_extinf = clean_title(lines[i])
-                output.append(modified_extinf)
-                
-                cursor = i + 1
-                while cursor < len(lines):
-                    current_line = lines[cursor].strip()
-                    if not current_line:
-                        cursor += 1
-                        continue
-                    
-                    if current_line.startswith("#EXTVLCOPT"):
-                        output.append(current_line)
-                    elif current_line.startswith("http"):
-                        output.append(current_line.replace(old_domain, new_domain))
-                        break
-                    elif current_line.startswith("#EXTINF"):
-                        break
-                    cursor += 1
+def clean_title(title):
+    return TITLE_RULES(title)
 
-        with open("pixelsports.m3u8", "w", encoding="utf-8") as f:
-            f.write("\n".join(output))
-            
-        count = sum(1 for line in output if line.startswith("#EXTINF"))
-        print(f"Success! {count} channels processed and shortened.")
+def rewrite_entry(entry):
+    # Force group-title to "pixelsports" and shorten the display name
+    entry.set_attr("group-title", "pixelsports")
+    entry.title = clean_title(entry.title)
+    entry.options = [o for o in entry.options if o.startswith("#EXTVLCOPT")]
+    entry.url = entry.url.replace(OLD_DOMAIN, NEW_DOMAIN)
+    return entry
+
+@metrics.instrument("pxl", OUTPUT_FILE)
+def process_m3u(session=requests):
+    print(f"Fetching and processing NBA/PIXEL events...")
+    fetched = fetch.fetch(SOURCE_URL, "pxl", session, timeout=10)
+    # Only the download is skipped: the rules below may have changed since the last run
+    if not fetched.changed:
+        print("Source unchanged, re-applying the rules to the stored copy.")
+
+    channels = []
+    
+    with metrics.stage("parse"):
+        for entry in PIXEL_FILTER.parse(fetched.path):
+            channels.append(rewrite_entry(entry))
 
-    except Exception as e:
-        print(f"Error: {e}")
+    count, _ = output.write_playlist(channels, OUTPUT_FILE)
+    fetched.commit()
+    print(f"Success! {count} channels processed and shortened.")
 
 if __name__ == "__main__":
     process_m3u()
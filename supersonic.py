@@ -1,7 +1,15 @@
 import asyncio
-import aiohttp
-import time
 import sys
+import time
+
+import delta
+import linkcheck
+import m3u
+import m3ufilter
+import metrics
+import output
+import portal
+import probecache
 
 # --- CONFIGURATION ---
 USER = "Z3nXfkOnf0"
@@ -11,77 +19,118 @@ FINAL_NAME = "supersonic.m3u8"
 
 # BALANCED SETTINGS
 MIN_MBPS = 0.8          # Lowered: 0.8Mbps is enough for SD/HD stability
-SAMPLE_SIZE = 500000    # Lowered to 500KB (faster test, less likely to be blocked)
+SAMPLE_SIZE = 500000    # Upper bound per stream; the reference the verdict is scaled to
+MEASURE_MODE = linkcheck.ADAPTIVE  # Stop early once the Mbps estimate settles (SAMPLE = always read it all)
 MAX_CONCURRENCY = 10    # Slow and steady to avoid IP bans
 TEST_TIMEOUT = 10       
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebkit/537.36"
+DELTA_SLICES = 8        # Runs every 6h: known streams are re-measured 1/8 per run, all within 2 days
+PROBE_MAX_AGE = 4 * 24 * 3600  # Two rotations: an older stored probe is a stream no longer listed
 
-tested_count = 0
-working_results = []
+SKIP_WORDS = ["adult", "24/7", "xxx"]
+CHANNEL_FILTER = m3ufilter.Filter(exclude=SKIP_WORDS)
+PROGRESS_INTERVAL = 0.25  # Seconds between progress line updates
 
-async def check_stream(session, sem, title, url, total):
-    global tested_count
-    async with sem:
-        try:
-            clean_title = title.lower()
-            if any(x in clean_title for x in ["adult", "24/7", "xxx"]):
-                tested_count += 1
-                return
+class ScanCollector:
+    """Collects scan results and prints a rate-limited progress line."""
 
-            start_time = time.time()
-            async with session.get(url, timeout=TEST_TIMEOUT) as r:
-                if r.status == 200:
-                    # We skip the strict MIME check and just try to read data
-                    content = await r.content.read(SAMPLE_SIZE)
-                    
-                    if len(content) > 1000: # Ensure we got at least some data
-                        elapsed = time.time() - start_time
-                        mbps = (len(content) * 8) / elapsed / 1000000
-                        
-                        if mbps >= MIN_MBPS:
-                            working_results.append((mbps, title, url))
-        except Exception:
-            pass
-        
-        tested_count += 1
-        sys.stdout.write(f"\r⚡ SCANNING: {tested_count}/{total} | Found Smooth: {len(working_results)}")
-        sys.stdout.flush()
+    def __init__(self, total=None):
+        self.total = total
+        self.tested = 0
+        self.working = []
+        self._last_print = 0.0
+
+    def add(self, title, url, result=None):
+        self.tested += 1
+        if result is not None and result.ok:
+            self.working.append((result.mbps, title, url))
+        self.progress()
 
-async def run():
-    # Use a standard connector; some servers dislike 'limit=0'
-    connector = aiohttp.TCPConnector(ssl=False)
-    headers = {"User-Agent": USER_AGENT}
-
-    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-        print(f"📡 Accessing RocketDNS...")
-        
-        try:
-            api_url = f"{ROCKET_BASE}/player_api.php"
-            params = {"username": USER, "password": PASS, "action": "get_live_streams"}
-            
-            async with session.get(api_url, params=params) as response:
-                raw_data = await response.json()
-                raw_channels = [(s['name'], f"{ROCKET_BASE}/live/{USER}/{PASS}/{s['stream_id']}.ts") for s in raw_data]
-                total_streams = len(raw_channels)
-                print(f"🔍 Found {total_streams} channels. Testing for stability...\n")
-        except Exception as e:
-            print(f"❌ Connection Error: {e}")
+    def progress(self, final=False):
+        now = time.monotonic()
+        if not final and now - self._last_print < PROGRESS_INTERVAL:
             return
+        self._last_print = now
+        total = f"/{self.total}" if self.total is not None else ""
+        sys.stdout.write(f"\r⚡ SCANNING: {self.tested}{total} | Found Smooth: {len(self.working)}")
+        sys.stdout.flush()
+
+async def check_stream(checker, collector, channel):
+    title, url = channel
+    if not CHANNEL_FILTER.text_ok(title):
+        collector.add(title, url)
+        return
+    # We skip the strict MIME check and just try to read data
+    collector.add(title, url, await checker.check(url))
+
+async def iter_channels(client, failed):
+    """Yields (title, url) while the stream list is still downloading."""
+    try:
+        async for s in client.live_streams():
+            yield s['name'], client.stream_url(s['stream_id'])
+    except Exception as e:
+        failed.append(e)
 
-        sem = asyncio.Semaphore(MAX_CONCURRENCY)
-        tasks = [check_stream(session, sem, t, u, total_streams) for t, u in raw_channels]
-        await asyncio.gather(*tasks)
+@metrics.instrument("supersonic", FINAL_NAME)
+async def run(session=None):
+    """Scans the whole provider; `session` is an optional shared aiohttp session."""
+    # Closed on every exit, including an error or the orchestrator cancelling the scan
+    with probecache.ProbeCache() as cache:
+        # New or changed streams are measured right away, known ones on a rotation
+        plan = delta.Delta("supersonic", cache, slices=DELTA_SLICES)
+        checker = linkcheck.Checker(
+            strategy=MEASURE_MODE,
+            timeout=TEST_TIMEOUT,
+            sample_size=SAMPLE_SIZE,
+            min_bytes=1000, # Ensure we got at least some data
+            min_mbps=MIN_MBPS,
+            max_in_flight=MAX_CONCURRENCY,
+            per_host=MAX_CONCURRENCY,
+            headers={"User-Agent": USER_AGENT},
+            session=session,
+            cache=cache,
+            delta=plan,
+        )
+
+        async with checker:
+            client = portal.XtreamClient(ROCKET_BASE, USER, PASS, checker.session, cache=portal.PortalCache())
+            print(f"📡 Accessing RocketDNS... testing channels for stability as they arrive\n")
+
+            # A fixed pool of workers pulls channels straight off the API response
+            collector = ScanCollector()
+            failed = []
+            # The channel list streams in while probing, so both land in one stage
+            with metrics.stage("fetch_probe"):
+                await linkcheck.run_queue(
+                    iter_channels(client, failed),
+                    lambda channel: check_stream(checker, collector, channel),
+                    workers=MAX_CONCURRENCY,
+                )
+            collector.progress(final=True)
+            if failed:
+                # A truncated channel list would overwrite the playlist with a partial one
+                print(f"\n❌ Connection Error: {failed[0]}")
+                return
+            print(f"\n🔍 Tested {collector.tested} channels")
+            print(plan.report())
+            cache.prune(PROBE_MAX_AGE, MEASURE_MODE)
+            print(client.cache.report())
 
-        # Sort by speed
-        working_results.sort(key=lambda x: x[0], reverse=True)
+            # Sort by speed; a reused result may not have measured one
+            working_results = sorted(collector.working, key=lambda x: x[0] or 0, reverse=True)
 
-        print(f"\n\n💾 Exporting {len(working_results)} streams to {FINAL_NAME}")
-        with open(FINAL_NAME, "w", encoding="utf-8") as f:
-            f.write("#EXTM3U\n")
-            for mbps, title, url in working_results:
-                f.write(f'#EXTINF:-1 group-title="Verified",{title}\n{url}\n')
+            print(f"\n\n💾 Exporting {len(working_results)} streams to {FINAL_NAME}")
+            # Speeds jitter between runs, so a reshuffle of the same streams is not a change
+            result = output.write_playlist(
+                (m3u.Entry(title, url, {"group-title": "Verified"}) for mbps, title, url in working_results),
+                FINAL_NAME,
+                unordered=True,
+            )
+            plan.finish()
+            if not result.changed:
+                print(f"Same streams as last run, {FINAL_NAME} left as it was")
 
-        print(f"✅ DONE!")
+            print(f"✅ DONE!")
 
 if __name__ == "__main__":
     asyncio.run(run())
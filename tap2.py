@@ -1,64 +1,26 @@
 import asyncio
-from playwright.async_api import async_playwright
 
-async def get_tv_tokens():
-    # Define the channels you want: { "Display Name": "Token Slug" }
-    channels = {
-        "American Heroes Channel": "AmericanHeroesChannel",
-        "BET HER": "BETHerEast",
-        "Boomerang": "Boomerang",
-        "Bravo": "BravoEast",
-        "C-SPAN": "CSPAN",
-        "C-SPAN 2": "CSPAN2",
-        "CMT": "CMTEast",
-        "Discovery Family": "DiscoveryFamily",
-        "Discovery Life": "DiscoveryLife",
-        "Disney Channel": "DisneyChannelEast",
-        "Animal Planet East": "AnimalPlanetEast"
-    }
-
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/146.0.0.0 Safari/537.36"
-        )
-        page = await context.new_page()
-
-        m3u_lines = ["#EXTM3U"]
-
-        for display_name, slug in channels.items():
-            try:
-                print(f"Fetching token for {display_name}...")
-                
-                # Navigate to the specific channel page to refresh session
-                await page.goto(f"https://thetvapp.to/tv/{slug.lower()}-live-stream/", wait_until="networkidle")
+import tvapp
+
+# Define the channels you want: { "Display Name": "Token Slug" }
+CHANNELS = {
+    "American Heroes Channel": "AmericanHeroesChannel",
+    "BET HER": "BETHerEast",
+    "Boomerang": "Boomerang",
+    "Bravo": "BravoEast",
+    "C-SPAN": "CSPAN",
+    "C-SPAN 2": "CSPAN2",
+    "CMT": "CMTEast",
+    "Discovery Family": "DiscoveryFamily",
+    "Discovery Life": "DiscoveryLife",
+    "Disney Channel": "DisneyChannelEast",
+    "Animal Planet East": "AnimalPlanetEast"
+}
+
+CHANNEL_SET = tvapp.ChannelSet("tap2.m3u8", "Cable TV [Mix]", CHANNELS)
 
-                # Fetch the token via the browser context
-                response = await page.evaluate(f"""
-                    fetch("https://thetvapp.to/token/{slug}", {{
-                        headers: {{ "Accept": "application/json" }}
-                    }}).then(res => res.json())
-                """)
-
-                if "url" in response:
-                    final_url = response["url"]
-                    m3u_lines.append(f'#EXTINF:-1 group-title="Cable TV [Mix]",{display_name}')
-                    m3u_lines.append(final_url)
-                    print(f"Successfully added {display_name}")
-                else:
-                    print(f"Failed to get URL for {display_name}")
-
-            except Exception as e:
-                print(f"Error fetching {display_name}: {e}")
-
-        # Save all results to the file
-        with open("tap2.m3u8", "w") as f:
-            f.write("\n".join(m3u_lines))
-            
-        print("\n--- DONE! ---")
-        print("'tap2.m3u8' updated with all available channels.")
-        
-        await browser.close()
+async def get_tv_tokens():
+    await tvapp.run([CHANNEL_SET])
 
 if __name__ == "__main__":
     asyncio.run(get_tv_tokens())
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import delta
+import linkcheck
+import m3u
+import metrics
+import output
+import probecache
+
+URLS = [f"http://h/live/{i}.ts" for i in range(40)]
+
+
+def test_cold_cache_probes_every_url_even_when_published(tmp_path):
+    published = tmp_path / "out.m3u8"
+    output.write_playlist((m3u.Entry(f"ch{i}", url) for i, url in enumerate(URLS)), str(published))
+    with probecache.ProbeCache(str(tmp_path / "p.sqlite")) as cache:
+        plan = delta.Delta("t", cache, state_path=str(tmp_path / "delta.json"))
+        assert all(plan.known(url, "range") is None for url in URLS)
+    assert plan.new == len(URLS)
+
+
+def test_stored_results_are_reused_outside_the_slice(tmp_path):
+    state = str(tmp_path / "delta.json")
+    reprobed = set()
+    with probecache.ProbeCache(str(tmp_path / "p.sqlite")) as cache:
+        for url in URLS:
+            cache.put(url, "range", True, 200, 0.1, 5.0)
+        for _ in range(4):
+            plan = delta.Delta("t", cache, slices=4, state_path=state)
+            for url in URLS:
+                row = plan.known(url, "range")
+                if row is None:
+                    reprobed.add(url)
+                else:
+                    assert row[:4] == (True, 200, 0.1, 5.0)
+            assert plan.new == 0 and plan.rotated + plan.reused == len(URLS)
+            plan.finish()
+    assert reprobed == set(URLS)
+
+
+def test_failed_results_expire_under_the_negative_ttl(tmp_path):
+    state = str(tmp_path / "delta.json")
+    with probecache.ProbeCache(str(tmp_path / "p.sqlite"), negative_ttl=600) as cache:
+        for url in URLS:
+            cache.put(url, "range", False, 404, checked_at=1000)
+        fresh = delta.Delta("t", cache, slices=4, state_path=state)
+        for url in URLS:
+            fresh.known(url, "range", now=1300)
+        expired = delta.Delta("t", cache, slices=4, state_path=state)
+        assert all(expired.known(url, "range", now=1900) is None for url in URLS)
+    assert fresh.reused == len(URLS) - fresh.rotated and fresh.retried == 0
+    assert expired.retried == len(URLS) - expired.rotated and expired.reused == 0
+
+
+def test_delta_counters_reach_the_metrics_report(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(metrics, "FORMATS", {"json"})
+    # Nothing listens on the discard port, so every probe fails fast
+    urls = [f"http://127.0.0.1:9/live/{i}.ts" for i in range(5)]
+
+    @metrics.instrument("t")
+    async def check(cache, plan):
+        async with linkcheck.Checker(timeout=2, cache=cache, delta=plan) as checker:
+            return await checker.check_many(urls)
+
+    with probecache.ProbeCache(str(tmp_path / "p.sqlite")) as cache:
+        plan = delta.Delta("t", cache, state_path=str(tmp_path / "delta.json"))
+        asyncio.run(check(cache, plan))
+    with open(tmp_path / "t.metrics.json", encoding="utf-8") as f:
+        counters = json.load(f)["counters"]
+    assert counters["delta_new"] == plan.new == len(urls)
+    assert counters["probes_failed"] == len(urls)
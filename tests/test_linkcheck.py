@@ -0,0 +1,26 @@
+import asyncio
+
+import linkcheck
+from bench.origin import FakeOrigin
+
+
+def probe(strategy, **options):
+    async def run():
+        origin = FakeOrigin(latency=0, failure_rate=0, body_size=64 * 1024)
+        base = await origin.start()
+        try:
+            async with linkcheck.Checker(strategy=strategy, **options) as checker:
+                return await checker.check_many([f"{base}/live/{i}.ts" for i in range(3)])
+        finally:
+            await origin.stop()
+
+    return asyncio.run(run())
+
+
+def test_range_probe_counts_the_bytes_it_read():
+    results = probe(linkcheck.RANGE, range_bytes=1024)
+    assert all(r.ok and r.nbytes == 1024 for r in results)
+
+
+def test_head_probe_reads_no_body():
+    assert all(r.ok and r.nbytes == 0 for r in probe(linkcheck.HEAD))
@@ -0,0 +1,74 @@
+import m3u
+
+PLAYLIST = (
+    b'#EXTM3U\n'
+    b'#EXTINF:-1 tvg-id="a.us" tvg-name="A, the channel" group-title="News",A, the channel\n'
+    b'#EXTVLCOPT:http-user-agent=VLC\n'
+    b'http://example.com/a.m3u8\n'
+    b'\n'
+    b'#EXTINF:-1 x-group-title="Other",B\r\n'
+    b'http://example.com/b.m3u8\r\n'
+    b'#EXTINF:-1 group-title="Dangling",No URL\n'
+)
+
+
+def test_parse_reads_titles_attrs_and_options():
+    a, b = m3u.parse(PLAYLIST)
+    assert a.title == "A, the channel"
+    assert a.get("tvg-id") == "a.us"
+    assert a.group == "News"
+    assert a.options == ["#EXTVLCOPT:http-user-agent=VLC"]
+    assert a.url == "http://example.com/a.m3u8"
+    assert b.title == "B"
+    assert b.group == ""
+    assert b.url == "http://example.com/b.m3u8"
+
+
+def test_parse_from_split_chunks_matches_bytes():
+    chunks = [PLAYLIST[i:i + 7] for i in range(0, len(PLAYLIST), 7)]
+    assert [e.to_bytes() for e in m3u.parse(chunks)] == [e.to_bytes() for e in m3u.parse(PLAYLIST)]
+
+
+def test_write_then_parse_round_trips():
+    entries = list(m3u.parse(PLAYLIST))
+    out = m3u.io.BytesIO()
+    assert m3u.write(entries, out) == 2
+    again = list(m3u.parse(out.getvalue()))
+    assert [e.to_bytes() for e in again] == [e.to_bytes() for e in entries]
+
+
+def test_set_attr_replaces_existing_value_in_place():
+    entry = next(m3u.parse(PLAYLIST))
+    entry.set_attr("group-title", "Pluto TV")
+    assert entry.group == "Pluto TV"
+    assert entry.title == "A, the channel"
+    assert entry.get("tvg-name") == "A, the channel"
+    assert entry.raw.count(b"group-title=") == 1
+
+
+def test_set_attr_ignores_longer_names_and_adds_before_title():
+    entry = list(m3u.parse(PLAYLIST))[1]
+    entry.set_attr("group-title", "Added")
+    assert entry.get("x-group-title") == "Other"
+    assert entry.group == "Added"
+    assert entry.title == "B"
+    assert next(m3u.parse(entry.to_bytes())).group == "Added"
+
+
+def test_set_attr_quotes_are_neutralized():
+    entry = m3u.Entry("T", "http://x/1", {"group-title": "G"})
+    entry.set_attr("group-title", 'say "hi"')
+    assert next(m3u.parse(entry.to_bytes())).group == "say 'hi'"
+
+
+def test_title_setter_keeps_attributes():
+    entry = next(m3u.parse(PLAYLIST))
+    entry.title = "Renamed"
+    assert entry.title == "Renamed"
+    assert entry.get("tvg-id") == "a.us"
+
+
+def test_prefilter_skips_block_with_its_options():
+    entries = list(m3u.parse(PLAYLIST, prefilter=lambda line: b"Other" in line))
+    assert [e.title for e in entries] == ["B"]
+    assert not entries[0].options
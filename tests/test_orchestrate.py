@@ -0,0 +1,62 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+import orchestrate
+
+# Blocking entry points the child processes import from here
+
+
+def sleep_forever():
+    time.sleep(60)
+
+
+def exit_three():
+    sys.exit(3)
+
+
+def fine():
+    pass
+
+
+def source(name, timeout=30):
+    return orchestrate.Source(name, f"tests.test_orchestrate:{name}", 0, timeout, 1, [], {})
+
+
+def run_one(src):
+    async def run():
+        return await orchestrate.run_source(src, orchestrate.Shared(), orchestrate.Budget(1))
+
+    return asyncio.run(run())
+
+
+def test_blocking_source_is_killed_on_timeout():
+    start = time.perf_counter()
+    ok, _, error = run_one(source("sleep_forever", timeout=1))
+    assert not ok and "timed out" in error
+    assert time.perf_counter() - start < 30
+
+
+def test_blocking_source_exit_status_fails_it():
+    ok, _, error = run_one(source("exit_three"))
+    assert not ok and error == "exited with status 3"
+
+
+def test_blocking_source_success():
+    assert run_one(source("fine"))[0]
+
+
+def test_state_file_in_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert asyncio.run(orchestrate.run([source("fine")], state_path="state.json"))
+    assert "fine" in orchestrate.load_state("state.json")
+
+
+def test_main_exits_non_zero_when_a_source_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(orchestrate, "SOURCES", [source("fine"), source("exit_three")])
+    monkeypatch.setattr(sys, "argv", ["orchestrate.py", "--state", str(tmp_path / "state.json")])
+    with pytest.raises(SystemExit) as exited:
+        orchestrate.main()
+    assert exited.value.code == 1
@@ -0,0 +1,36 @@
+import os
+
+import m3u
+import output
+
+
+def test_sync_dir_adds_updates_removes_and_skips_unchanged(tmp_path):
+    folder = tmp_path / "channels"
+    report = output.sync_dir(str(folder), {"a.m3u8": "A", "b.m3u8": b"B"})
+    assert report == output.SyncReport(added=2, updated=0, removed=0, unchanged=0)
+
+    before = os.stat(folder / "a.m3u8").st_mtime_ns
+    (folder / "stray.txt").write_text("x")
+    report = output.sync_dir(str(folder), {"a.m3u8": "A", "b.m3u8": "B2", "c.m3u8": "C"})
+    assert report == output.SyncReport(added=1, updated=1, removed=1, unchanged=1)
+    assert os.stat(folder / "a.m3u8").st_mtime_ns == before
+    assert sorted(os.listdir(folder)) == ["a.m3u8", "b.m3u8", "c.m3u8"]
+    assert (folder / "b.m3u8").read_bytes() == b"B2"
+
+
+def test_sync_dir_leaves_subdirectories_and_no_temp_files(tmp_path):
+    (tmp_path / "keep").mkdir()
+    output.sync_dir(str(tmp_path), {"a.m3u8": "A"})
+    assert sorted(os.listdir(tmp_path)) == ["a.m3u8", "keep"]
+
+
+def test_write_playlist_skips_identical_content(tmp_path):
+    path = str(tmp_path / "out.m3u8")
+    entries = [m3u.Entry("A", "http://x/a"), m3u.Entry("B", "http://x/b")]
+    assert output.write_playlist(entries, path) == output.WriteResult(2, True)
+    assert output.write_playlist(entries, path) == output.WriteResult(2, False)
+    # Order matters by default, not with unordered=True
+    assert output.write_playlist(entries[::-1], path).changed
+    assert not output.write_playlist(entries, path, unordered=True).changed
+    assert output.write_playlist(entries[:1], path, unordered=True).changed
+    assert oct(os.stat(path).st_mode & 0o777) == oct(0o644)
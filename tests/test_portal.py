@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import pytest
+
+import portal
+
+
+def collect(chunks):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [item async for item in portal.iter_json_array(source())]
+
+    return asyncio.run(run())
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+ITEMS = [{"name": "Çanal ⁸ᴷ", "stream_id": 1}, 2, "three", [4], {"nested": {"x": [1, 2]}}, 10]
+
+
+def test_items_survive_any_chunking():
+    data = json.dumps(ITEMS, ensure_ascii=False).encode("utf-8")
+    for size in (1, 2, 3, 7, len(data)):
+        assert collect(split(data, size)) == ITEMS
+
+
+def test_empty_array():
+    assert collect([b" [ ] "]) == []
+
+
+def test_truncated_array_raises():
+    data = json.dumps(ITEMS).encode()
+    with pytest.raises(ValueError):
+        collect([data[:-1]])
+    with pytest.raises(ValueError):
+        collect(split(data[:len(data) // 2], 5))
+
+
+def test_corrupt_item_raises():
+    with pytest.raises(ValueError):
+        collect([b'[{"a": 1}, {"b": nope}, {"c": 3}]'])
+
+
+def test_not_an_array_raises():
+    with pytest.raises(ValueError):
+        collect([b'{"a": 1}'])
+
+
+class FakeStalker(portal.StalkerClient):
+    """Serves get_ordered_list from memory; pages listed in `failing` fail."""
+
+    def __init__(self, cache, failing=()):
+        super().__init__("http://portal.invalid", "00:1A:79:00:00:00", cache=cache, workers=2)
+        self.failing = set(failing)
+
+    def call(self, action, params=None, type="itv"):
+        page = params["p"]
+        if page in self.failing:
+            return None
+        return {"total_items": 5, "max_page_items": 2,
+                "data": [{"id": i} for i in range((page - 1) * 2, min(page * 2, 5))]}
+
+
+def test_channels_pages_through_listing(tmp_path):
+    with FakeStalker(portal.PortalCache(str(tmp_path))) as client:
+        assert [c["id"] for c in client.channels("7")] == [0, 1, 2, 3, 4]
+
+
+def test_failed_page_returns_none_and_caches_nothing(tmp_path):
+    cache = portal.PortalCache(str(tmp_path))
+    with FakeStalker(cache, failing={2}) as client:
+        assert client.channels("7") is None
+    with FakeStalker(cache, failing={1}) as client:
+        assert client.channels("7") is None
+    with FakeStalker(cache) as client:
+        assert len(client.channels("7")) == 5
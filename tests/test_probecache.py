@@ -0,0 +1,56 @@
+import asyncio
+
+import linkcheck
+import probecache
+
+
+def test_normalize_url_lowercases_host_and_drops_default_port_and_fragment():
+    assert probecache.normalize_url(" HTTP://Example.COM:80/Live?a=1#x ") == "http://example.com/Live?a=1"
+    assert probecache.normalize_url("https://h:8443") == "https://h:8443/"
+
+
+def test_normalize_url_keeps_credentials_apart():
+    assert probecache.normalize_url("http://a:b@h/x") != probecache.normalize_url("http://c:d@h/x")
+
+
+def test_normalize_url_falls_back_on_malformed_port():
+    assert probecache.normalize_url(" http://host:port/x ") == "http://host:port/x"
+
+
+def test_cache_round_trip_with_malformed_url(tmp_path):
+    with probecache.ProbeCache(str(tmp_path / "p.sqlite")) as cache:
+        cache.put("http://host:port/x", "head", False, 0)
+        assert cache.get("http://host:port/x", "head")[0] is False
+        assert cache.last("http://host:port/x", "head") is not None
+
+
+def test_checker_with_cache_reports_malformed_url_as_failed(tmp_path):
+    async def check():
+        async with linkcheck.Checker(cache=cache) as checker:
+            return await checker.check_many(["http://host:port/x"])
+
+    with probecache.ProbeCache(str(tmp_path / "p.sqlite")) as cache:
+        [result] = asyncio.run(check())
+    assert not result.ok
+
+
+def test_two_processes_can_write_in_turn(tmp_path):
+    # Each put commits, so one source's cache never holds the write lock against another's
+    path = str(tmp_path / "p.sqlite")
+    with probecache.ProbeCache(path) as a, probecache.ProbeCache(path) as b:
+        for i in range(5):
+            a.put(f"http://a/{i}", "head", True, 200)
+            b.put(f"http://b/{i}", "head", True, 200)
+        assert b.last("http://a/4", "head") is not None
+        assert a.last("http://b/4", "head") is not None
+
+
+def test_prune_drops_only_old_rows_of_the_strategy(tmp_path):
+    with probecache.ProbeCache(str(tmp_path / "p.sqlite")) as cache:
+        cache.put("http://h/old", "head", True, 200, checked_at=1)
+        cache.put("http://h/old", "range", True, 200, checked_at=1)
+        cache.put("http://h/new", "head", True, 200)
+        assert cache.prune(3600, "head") == 1
+        assert cache.last("http://h/old", "head") is None
+        assert cache.last("http://h/old", "range") is not None
+        assert cache.last("http://h/new", "head") is not None
@@ -0,0 +1,44 @@
+import pytest
+import requests
+
+import pxl
+import rk
+from bench.origin import FakeOrigin
+
+SOURCE = (b"#EXTM3U\n"
+          b'#EXTINF:-1 group-title="x",[NBA] Boston Celtics vs Miami Heat (PIXEL)\n'
+          b"https://hd.bestlive.top:443/a.m3u8\n"
+          b'#EXTINF:-1 group-title="x",STAR MOVIES\n'
+          b"http://example.com/star.m3u8\n")
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    origin = FakeOrigin()
+    origin.set_playlist(SOURCE)
+    return origin, origin.start_in_thread()
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_unchanged_source_still_gets_the_current_rules(origin, monkeypatch):
+    origin, base = origin
+    monkeypatch.setattr(pxl, "SOURCE_URL", f"{base}/playlist.m3u")
+    pxl.process_m3u()
+    assert "hd.pixelhd.online" in read(pxl.OUTPUT_FILE)
+    # The rewrite rule changes in code while upstream stays the same (a 304)
+    monkeypatch.setattr(pxl, "NEW_DOMAIN", "https://new.example:443")
+    pxl.process_m3u()
+    assert "new.example" in read(pxl.OUTPUT_FILE)
+    assert "BOS vs MIA" in read(pxl.OUTPUT_FILE)
+
+
+def test_fetch_errors_propagate(origin, monkeypatch):
+    origin, base = origin
+    monkeypatch.setattr(rk, "url", f"{base}/missing.m3u")
+    with pytest.raises(requests.HTTPError):
+        rk.save_filtered_m3u8()
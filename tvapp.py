@@ -0,0 +1,172 @@
+import asyncio
+import time
+from collections import namedtuple
+
+from playwright.async_api import async_playwright
+
+import browser
+import m3u
+import metrics
+import output
+
+# Shared thetvapp.to token fetcher.
+# One Chromium instance serves every channel set and a pool of workers takes
+# channels from a single queue. In warm mode the workers share one context whose
+# session was seeded by a single lightweight page load and request tokens
+# directly; otherwise each worker loads every channel page in its own context.
+
+BASE_URL = "https://thetvapp.to"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/146.0.0.0 Safari/537.36"
+POOL_SIZE = 4
+WARM_MODE = True  # Request tokens from one warmed context instead of loading every page
+
+# output: playlist file, group: group-title, channels: { "Display Name": "Token Slug" }
+ChannelSet = namedtuple("ChannelSet", "output group channels")
+
+FETCH_TOKEN_JS = """
+    url => fetch(url, {
+        headers: { "Accept": "application/json" }
+    }).then(res => res.json())
+"""
+
+
+def channel_page(slug):
+    return f"{BASE_URL}/tv/{slug.lower()}-live-stream/"
+
+
+async def fetch_token(page, slug):
+    """Loads the channel page to refresh the session, then asks for a stream token."""
+    # Navigate to the specific channel page to refresh session
+    with metrics.stage("browser_navigation"):
+        await page.goto(channel_page(slug), wait_until="networkidle")
+
+    # Fetch the token via the browser context
+    with metrics.stage("token_fetch"):
+        response = await page.evaluate(FETCH_TOKEN_JS, f"{BASE_URL}/token/{slug}")
+    return response.get("url") if isinstance(response, dict) else None
+
+
+async def warm_up(context, slug):
+    """Loads one channel page with heavy resources blocked to seed the session cookies."""
+    page = await context.new_page()
+    try:
+        await browser.block_resources(page, BASE_URL)
+        with metrics.stage("browser_navigation"):
+            await page.goto(channel_page(slug), wait_until="networkidle")
+    finally:
+        await page.close()
+
+
+async def request_token(context, slug):
+    """Asks for a token through the context's request API, reusing the warmed cookies."""
+    try:
+        with metrics.stage("token_fetch"):
+            response = await context.request.get(
+                f"{BASE_URL}/token/{slug}",
+                headers={"Accept": "application/json", "Referer": channel_page(slug)},
+            )
+            if not response.ok:
+                return None
+            data = await response.json()
+    except Exception:
+        return None
+    return data.get("url") if isinstance(data, dict) else None
+
+
+async def _worker(context, queue, results, warm):
+    page = None
+    while not queue.empty():
+        key = queue.get_nowait()
+        display_name, slug = key[1], key[2]
+        try:
+            print(f"Fetching token for {display_name}...")
+            url = await request_token(context, slug) if warm else None
+            if not url:
+                # Cold start, or the warm session was rejected: do the full page load
+                if page is None:
+                    page = await context.new_page()
+                url = await fetch_token(page, slug)
+            if url:
+                results[key] = url
+                metrics.add("tokens_ok")
+                print(f"Successfully added {display_name}")
+            else:
+                metrics.add("tokens_failed")
+                print(f"Failed to get URL for {display_name}")
+        except Exception as e:
+            print(f"Error fetching {display_name}: {e}")
+    if page is not None:
+        await page.close()
+
+
+async def _fetch_all(chromium, queue, results, first_slug, pool_size, warm):
+    workers = min(pool_size, queue.qsize()) or 1
+    if warm and first_slug:
+        context = await chromium.new_context(user_agent=USER_AGENT)
+        try:
+            await warm_up(context, first_slug)
+        except Exception as e:
+            print(f"Warm-up failed, falling back to page loads: {e}")
+        contexts = [context]
+    else:
+        contexts = [await chromium.new_context(user_agent=USER_AGENT) for _ in range(workers)]
+    try:
+        await asyncio.gather(*(_worker(contexts[i % len(contexts)], queue, results, warm)
+                               for i in range(workers)))
+    finally:
+        for context in contexts:
+            await context.close()
+
+
+async def run(channel_sets, pool_size=POOL_SIZE, warm=WARM_MODE, chromium=None):
+    """Fetches tokens for every channel set with one browser and writes each playlist.
+
+    With warm=True a single context is warmed up once and tokens are requested
+    directly; page navigations only happen for channels whose request fails.
+    Otherwise every worker gets its own context and loads each channel page.
+    A caller-owned `chromium` browser is used as is and left open.
+    """
+    queue = asyncio.Queue()
+    for index, channel_set in enumerate(channel_sets):
+        for display_name, slug in channel_set.channels.items():
+            queue.put_nowait((index, display_name, slug))
+    first_slug = next((slug for cs in channel_sets for slug in cs.channels.values()), None)
+    results = {}
+    start = time.perf_counter()
+
+    if chromium is None:
+        async with async_playwright() as p:
+            chromium = await p.chromium.launch(headless=True)
+            await _fetch_all(chromium, queue, results, first_slug, pool_size, warm)
+            await chromium.close()
+    else:
+        await _fetch_all(chromium, queue, results, first_slug, pool_size, warm)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(results)} tokens in {elapsed:.1f}s ({len(results) / elapsed * 60:.0f} tokens/min)")
+    # Keep each playlist in the order its channel dict was written
+    for index, channel_set in enumerate(channel_sets):
+        entries = [
+            m3u.Entry(display_name, results[(index, display_name, slug)], {"group-title": channel_set.group})
+            for display_name, slug in channel_set.channels.items()
+            if (index, display_name, slug) in results
+        ]
+        result = output.write_playlist(entries, channel_set.output)
+        state = "updated" if result.changed else "unchanged"
+        print(f"'{channel_set.output}' {state} with {result.count} of {len(channel_set.channels)} channels.")
+
+    print("\n--- DONE! ---")
+
+
+def all_channel_sets():
+    import tap, tap2, tap3
+    return [tap.CHANNEL_SET, tap2.CHANNEL_SET, tap3.CHANNEL_SET]
+
+
+@metrics.instrument("tvapp")
+async def main(chromium=None):
+    await run(all_channel_sets(), chromium=chromium)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())